@@ -0,0 +1,40 @@
+"""
+Checkpoint files for resuming long genetic algorithm runs.
+
+A checkpoint is a small pickled dict: the population in compact form, the
+RNG state, the generation number, the best fitness history and the best
+solution. Only load checkpoints you wrote yourself (pickle can run code).
+"""
+import os
+import pickle
+import zlib
+
+CHECKPOINT_VERSION = 1
+
+
+def fingerprint(*parts):
+    """Checksum identifying the problem a checkpoint belongs to."""
+    return zlib.crc32(repr(parts).encode())
+
+
+def save_checkpoint(path, kind, fingerprint_value, state):
+    """
+    Atomically write state (a dict) for an algorithm of the given kind
+    ('timetable' or 'datesheet'); a crash while writing keeps the old file.
+    """
+    data = dict(state, kind=kind, version=CHECKPOINT_VERSION, fingerprint=fingerprint_value)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, kind, fingerprint_value):
+    """Read a checkpoint, checking that it was written for the same kind of run and problem."""
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    if data.get('kind') != kind or data.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a {kind} checkpoint of version {CHECKPOINT_VERSION}.")
+    if data.get('fingerprint') != fingerprint_value:
+        raise ValueError(f"Checkpoint {path} was written for a different problem.")
+    return data
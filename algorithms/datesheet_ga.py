@@ -1,18 +1,44 @@
 """
 Genetic algorithm for generating examination datesheets.
 """
+import functools
+import itertools
 import random
+import time
+from array import array
+
+from algorithms.checkpoint import fingerprint, load_checkpoint, save_checkpoint
+from algorithms.datesheet_problem import DatesheetProblem, ScoredSchedule
+from algorithms.parallel import create_pool, map_chunks
+from algorithms.snapshot import GenerationSnapshot
 
 class DatesheetGeneticAlgorithm:
-    def __init__(self, entries, max_generations=100, population_size=50):
+    def __init__(self, entries, max_generations=100, population_size=50, seed=None, slot_domain=None,
+                 conflict_graph=None, initial_schedule=None):
         """
         entries: list of dicts with keys 'date', 'subject', 'room', 'time'
-        max_generations: number of generations to evolve
+        max_generations: number of generations to evolve (None for no limit when a time budget is used)
         population_size: number of candidate schedules per generation
+        seed: seed for the random number generator, for reproducible runs
+        slot_domain: optional ExamSlotDomain (see algorithms.exam_slots) for
+        exams exploded from UI date ranges; the search then covers every exam
+        day and session of the calendar instead of the dates in entries
+        conflict_graph: optional student-conflict graph (see
+        algorithms.exam_conflicts) whose clashes the fitness also penalises
+        initial_schedule: optional list of exam dicts (aligned with entries)
+        placed in the initial population, e.g. a graph colouring to refine
         """
         self.entries = entries
         self.max_generations = max_generations
         self.population_size = population_size
+        self.rng = random.Random(seed)
+        self.best_fitness_history = []
+        # Integer-encoded view of the problem used during evolution
+        self.problem = DatesheetProblem(entries, slot_domain, conflict_graph)
+        self.initial_schedule = initial_schedule
+        # Individuals carry their own score; hits are score lookups served from
+        # it, misses are full fitness evaluations
+        self.fitness_stats = {'hits': 0, 'misses': 0}
 
     def calculate_fitness(self, schedule):
         """
@@ -54,72 +80,234 @@ class DatesheetGeneticAlgorithm:
 
     def crossover(self, parent1, parent2):
         """
-        Single-point crossover between two schedules.
+        Single-point crossover between two schedules; the children share no
+        arrays with their parents and are not scored yet.
         """
-        point = random.randint(0, len(parent1) - 1)
-        child1 = parent1[:point] + parent2[point:]
-        child2 = parent2[:point] + parent1[point:]
+        point = self.rng.randint(0, len(parent1.dates) - 1)
+        child1 = ScoredSchedule(parent1.dates[:point] + parent2.dates[point:],
+                                parent1.rooms[:point] + parent2.rooms[point:])
+        child2 = ScoredSchedule(parent2.dates[:point] + parent1.dates[point:],
+                                parent2.rooms[:point] + parent1.rooms[point:])
         return child1, child2
 
     def mutate(self, schedule):
         """
-        Randomly change date or room in the schedule.
+        Randomly change date or room in the schedule (in place, clearing its score).
         """
-        mutated = [exam.copy() for exam in schedule]
-        for exam in mutated:
-            if random.random() < 0.1:  # 10% chance
-                if random.random() < 0.5:
-                    exam['date'] = random.choice(
-                        list({e['date'] for e in self.entries})
-                    )
+        rand = self.rng.random
+        randrange = self.rng.randrange
+        num_dates = self.problem.num_dates
+        num_rooms = self.problem.num_rooms
+        exam_dates = self.problem.exam_dates
+        dates, rooms = schedule.dates, schedule.rooms
+        for exam in range(len(dates)):
+            if rand() < 0.1:  # 10% chance
+                if rand() < 0.5:
+                    if exam_dates is None:
+                        dates[exam] = randrange(num_dates)
+                    else:
+                        allowed = exam_dates[exam]
+                        dates[exam] = allowed[randrange(len(allowed))]
                 else:
-                    exam['room'] = random.choice(
-                        list({e['room'] for e in self.entries})
-                    )
-        return mutated
+                    rooms[exam] = randrange(num_rooms)
+        schedule.score = None
+        return schedule
 
     def generate_initial_population(self):
         """
-        Create initial random population of schedules.
+        Create initial random population of schedules (not scored yet),
+        starting with initial_schedule if one was given.
         """
         population = []
-        dates = list({e['date'] for e in self.entries})
-        rooms = list({e['room'] for e in self.entries})
-
-        for _ in range(self.population_size):
-            schedule = []
-            for exam in self.entries:
-                new_exam = exam.copy()
-                new_exam['date'] = random.choice(dates)
-                new_exam['room'] = random.choice(rooms)
-                schedule.append(new_exam)
-            population.append(schedule)
+        if self.initial_schedule is not None:
+            population.append(ScoredSchedule(*self.problem.encode(self.initial_schedule)))
+        randrange = self.rng.randrange
+        num_dates = self.problem.num_dates
+        num_rooms = self.problem.num_rooms
+        exam_dates = self.problem.exam_dates
+
+        while len(population) < self.population_size:
+            dates = array('H', bytes(2 * self.problem.num_exams))
+            rooms = array('H', bytes(2 * self.problem.num_exams))
+            for exam in range(self.problem.num_exams):
+                if exam_dates is None:
+                    dates[exam] = randrange(num_dates)
+                else:
+                    allowed = exam_dates[exam]
+                    dates[exam] = allowed[randrange(len(allowed))]
+                rooms[exam] = randrange(num_rooms)
+            population.append(ScoredSchedule(dates, rooms))
         return population
 
-    def run(self):
+    def _score_chunk(self, schedules):
+        """
+        Worker side of parallel scoring. Each schedule arrives as its
+        (dates bytes, rooms bytes) pair.
+        """
+        scores = []
+        for dates_bytes, rooms_bytes in schedules:
+            dates = array('H')
+            dates.frombytes(dates_bytes)
+            rooms = array('H')
+            rooms.frombytes(rooms_bytes)
+            scores.append(self.problem.fitness(dates, rooms))
+        return scores
+
+    def _score_population(self, population, pool, workers):
+        """
+        Score the schedules that have no cached score yet, in parallel when a
+        pool is given; schedules carried over keep their score.
+        """
+        unscored = [sched for sched in population if sched.score is None]
+        self.fitness_stats['hits'] += len(population) - len(unscored)
+        self.fitness_stats['misses'] += len(unscored)
+        if pool is None:
+            scores = [self.problem.fitness(sched.dates, sched.rooms) for sched in unscored]
+        else:
+            compact = [(sched.dates.tobytes(), sched.rooms.tobytes()) for sched in unscored]
+            scores = map_chunks(pool, '_score_chunk', compact, workers)
+        for sched, score in zip(unscored, scores):
+            sched.score = score
+
+    def run(self, workers=None, time_budget_seconds=None, on_progress=None, cancel_token=None,
+            checkpoint_path=None, checkpoint_interval=10, resume_from=None):
         """
         Evolve the population and return the best schedule.
+        workers: number of worker processes used for scoring (None or 1
+        runs serially). With a fixed seed the result is the same as a serial run.
+        time_budget_seconds: stop once this much wall-clock time has passed and
+        return the best schedule found so far
+        on_progress: optional callback on_progress(generation, best_score, elapsed)
+        called after every generation
+        cancel_token: optional threading.Event (or any object with is_set());
+        once it is set the run returns the best schedule found so far
+        checkpoint_path: write a checkpoint to this file every checkpoint_interval
+        generations and when the run ends (also when it fails)
+        resume_from: continue the run saved in this checkpoint file; with a fixed
+        seed the result is the same as an uninterrupted run
+        """
+        best = None
+        for snapshot in self.evolve(workers, time_budget_seconds, cancel_token, checkpoint_path,
+                                    checkpoint_interval, resume_from, record_history=True):
+            best = snapshot.best
+            if on_progress is not None:
+                on_progress(snapshot.generation, snapshot.best_score, snapshot.elapsed)
+        # Converted back to the list of exam dicts
+        return self.problem.decode(best) if best is not None else None
+
+    def evolve(self, workers=None, time_budget_seconds=None, cancel_token=None, checkpoint_path=None,
+               checkpoint_interval=10, resume_from=None, record_history=False):
+        """
+        Generator evolving the population one generation at a time. After every
+        generation it yields a GenerationSnapshot (generation, best_score, best
+        schedule of the generation, diversity, elapsed); stop iterating (or close
+        the generator) to stop the run. Options as for run; the last snapshot
+        (generation max_generations) scores the final population.
+        record_history: append every generation's best score to best_fitness_history
         """
-        population = self.generate_initial_population()
-
-        for _ in range(self.max_generations):
-            # Score and sort
-            scored = [(sched, self.calculate_fitness(sched)) for sched in population]
-            scored.sort(key=lambda x: x[1], reverse=True)
-
-            # Select top half
-            top = [sched for sched, fit in scored[:self.population_size // 2]]
-
-            # Reproduce
-            new_pop = top.copy()
-            while len(new_pop) < self.population_size:
-                p1, p2 = random.sample(top, 2)
-                c1, c2 = self.crossover(p1, p2)
-                new_pop.append(self.mutate(c1))
-                if len(new_pop) < self.population_size:
-                    new_pop.append(self.mutate(c2))
-            population = new_pop
-
-        # Return best schedule
-        best = max(population, key=self.calculate_fitness)
-        return best
+        if self.max_generations is None and time_budget_seconds is None and cancel_token is None:
+            raise ValueError("Either max_generations, a time budget or a cancel token is required.")
+
+        run_control = (time_budget_seconds, cancel_token, checkpoint_path,
+                       checkpoint_interval, resume_from, record_history)
+        if workers and workers > 1:
+            with create_pool(self, workers) as pool:
+                yield from self._evolve(pool, workers, *run_control)
+        else:
+            yield from self._evolve(None, 1, *run_control)
+
+    def _checkpoint_fingerprint(self):
+        parts = [self.problem.dates, self.problem.rooms, self.problem.exam_subject]
+        if self.problem.exam_dates is not None:
+            parts.append(self.problem.exam_dates)
+        if self.problem.conflict_edges is not None:
+            parts.append(self.problem.conflict_edges)
+        return fingerprint(*parts)
+
+    @staticmethod
+    def _from_bytes(dates_bytes, rooms_bytes, score):
+        """Rebuild a schedule from its compact serialized form."""
+        dates = array('H')
+        dates.frombytes(dates_bytes)
+        rooms = array('H')
+        rooms.frombytes(rooms_bytes)
+        return ScoredSchedule(dates, rooms, score)
+
+    def _evolve(self, pool, workers, time_budget_seconds=None, cancel_token=None, checkpoint_path=None,
+                checkpoint_interval=10, resume_from=None, record_history=False):
+        """Main generation loop shared by the serial and parallel modes."""
+        start = time.perf_counter()
+        self.fitness_stats = {'hits': 0, 'misses': 0}
+        first_generation = 0
+        best = None
+        if resume_from is not None:
+            saved = load_checkpoint(resume_from, 'datesheet', self._checkpoint_fingerprint())
+            first_generation = saved['generation']
+            self.rng.setstate(saved['rng_state'])
+            self.best_fitness_history = list(saved['best_fitness_history'])
+            if saved['best'] is not None:
+                best = self._from_bytes(*saved['best'])
+            population = [self._from_bytes(*compact) for compact in saved['population']]
+        else:
+            population = self.generate_initial_population()
+
+        if self.max_generations is not None:
+            # One more scoring round than breeding rounds: the last one scores the final population
+            generations = range(first_generation, self.max_generations + 1)
+        else:
+            generations = itertools.count(first_generation)
+        checkpoint_refs = None
+        try:
+            for generation in generations:
+                if checkpoint_path is not None:
+                    # References to the state at the start of this generation; only
+                    # serialized every interval and on exit
+                    checkpoint_refs = (generation, list(population), self.rng.getstate(),
+                                       len(self.best_fitness_history), best)
+                    if generation > first_generation and generation % checkpoint_interval == 0:
+                        self._save_checkpoint(checkpoint_path, *checkpoint_refs)
+
+                # Score the new schedules and sort
+                self._score_population(population, pool, workers)
+                population.sort(key=lambda sched: sched.score, reverse=True)
+                if record_history:
+                    self.best_fitness_history.append(population[0].score)
+                if best is None or population[0].score > best.score:
+                    best = population[0]
+
+                yield GenerationSnapshot(generation, population[0].score, population[0], time.perf_counter() - start,
+                                         functools.partial(self.problem.population_diversity, population))
+
+                # Out of time, cancelled or done: the top of this generation is the best so far
+                if time_budget_seconds is not None and time.perf_counter() - start >= time_budget_seconds:
+                    return
+                if cancel_token is not None and cancel_token.is_set():
+                    return
+                if self.max_generations is not None and generation == self.max_generations:
+                    return
+
+                # Select top half
+                top = population[:self.population_size // 2]
+
+                # Reproduce
+                new_pop = top.copy()
+                while len(new_pop) < self.population_size:
+                    p1, p2 = self.rng.sample(top, 2)
+                    c1, c2 = self.crossover(p1, p2)
+                    new_pop.append(self.mutate(c1))
+                    if len(new_pop) < self.population_size:
+                        new_pop.append(self.mutate(c2))
+                population = new_pop
+        finally:
+            if checkpoint_refs is not None:
+                self._save_checkpoint(checkpoint_path, *checkpoint_refs)
+
+    def _save_checkpoint(self, path, generation, population, rng_state, history_length, best):
+        """Write the state captured at the start of a generation (see _evolve)."""
+        save_checkpoint(path, 'datesheet', self._checkpoint_fingerprint(), {
+            'generation': generation,
+            'population': [(sched.dates.tobytes(), sched.rooms.tobytes(), sched.score) for sched in population],
+            'rng_state': rng_state,
+            'best_fitness_history': self.best_fitness_history[:history_length],
+            'best': (best.dates.tobytes(), best.rooms.tobytes(), best.score) if best is not None else None,
+        })
@@ -0,0 +1,178 @@
+"""
+Compact integer encoding of a datesheet problem for the genetic algorithm.
+"""
+from array import array
+
+import numpy as np
+
+
+class DatesheetProblem:
+    def __init__(self, entries, slot_domain=None, conflict_graph=None):
+        """
+        entries: list of dicts with keys 'date', 'subject', 'room', 'time'
+        slot_domain: optional ExamSlotDomain; entries are then its exploded
+        exams, dates are all slots of the calendar and every exam only takes
+        the slots listed in its 'slots' key. Slots overlapping in time count
+        as the same date for conflicts.
+        conflict_graph: optional list of neighbouring exam indices per exam
+        (see algorithms.exam_conflicts); two neighbours sharing a date count
+        as one more conflict
+
+        Dates, rooms and subjects are interned to small integers once here
+        (in order of first appearance), so a schedule is just two arrays:
+        the date index and the room index of every exam.
+        """
+        self.entries = entries
+        self.num_exams = len(entries)
+        self.dates = []
+        self.rooms = []
+        self.subjects = []
+        date_index, room_index, subject_index = {}, {}, {}
+        # Allowed date indices of every exam (None: any date)
+        self.exam_dates = None
+        # Per date: the dates overlapping it in time, itself included (None: only itself)
+        self.date_overlaps = None
+        if slot_domain is not None:
+            self.dates = list(slot_domain.labels)
+            date_index = dict(slot_domain.slot_index)
+            self.exam_dates = [exam['slots'] for exam in entries]
+            if any(len(overlaps) > 1 for overlaps in slot_domain.slot_overlaps):
+                self.date_overlaps = slot_domain.slot_overlaps
+                self._overlap_sets = [frozenset(overlaps) for overlaps in self.date_overlaps]
+        # Student-conflict edges (a, b) with a < b
+        self.conflict_edges = None
+        if conflict_graph is not None:
+            self.conflict_edges = [(exam, other) for exam, adjacent in enumerate(conflict_graph)
+                                   for other in sorted(adjacent) if other > exam]
+        self.exam_subject = []
+        for exam in entries:
+            self._intern(exam['date'], date_index, self.dates)
+            self._intern(exam['room'], room_index, self.rooms)
+            self.exam_subject.append(self._intern(exam['subject'], subject_index, self.subjects))
+        self.num_dates = len(self.dates)
+        self.num_rooms = len(self.rooms)
+        self._date_index = date_index
+        self._room_index = room_index
+
+    @staticmethod
+    def _intern(value, index, values):
+        """Return the integer id of value, assigning the next free id if it is new."""
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+        return index[value]
+
+    def encode(self, schedule):
+        """Convert a list of exam dicts (aligned with entries) into (dates, rooms) arrays."""
+        return (array('H', (self._date_index[exam['date']] for exam in schedule)),
+                array('H', (self._room_index[exam['room']] for exam in schedule)))
+
+    def decode(self, schedule):
+        """Convert a ScoredSchedule back into the list of exam dicts used by the UI."""
+        decoded = []
+        for exam, date, room in zip(self.entries, schedule.dates, schedule.rooms):
+            new_exam = exam.copy()
+            new_exam['date'] = self.dates[date]
+            new_exam['room'] = self.rooms[room]
+            decoded.append(new_exam)
+        return decoded
+
+    def fitness(self, dates, rooms):
+        """
+        Same value as DatesheetGeneticAlgorithm.calculate_fitness (higher is
+        better), counted with flat integer arrays instead of dicts of sets.
+        With a conflict graph, student conflicts are added to the count;
+        with overlapping sessions, see _overlap_fitness.
+        """
+        if not self.num_exams:
+            return 0.0
+        if self.date_overlaps is not None:
+            return self._overlap_fitness(dates, rooms)
+        num_dates = self.num_dates
+        subject_on_date = [0] * (len(self.subjects) * num_dates)
+        room_on_date = [0] * (self.num_rooms * num_dates)
+        date_used = [False] * num_dates
+        conflicts = 0
+        for date, room, subject in zip(dates, rooms, self.exam_subject):
+            # Subject conflict - same subject twice on one date
+            key = subject * num_dates + date
+            if subject_on_date[key]:
+                conflicts += 1
+            subject_on_date[key] += 1
+            # Room conflict - same room twice on one date
+            key = room * num_dates + date
+            if room_on_date[key]:
+                conflicts += 1
+            room_on_date[key] += 1
+            date_used[date] = True
+        if self.conflict_edges is not None:
+            # Student conflict - exams sharing students on one date
+            for exam, other in self.conflict_edges:
+                if dates[exam] == dates[other]:
+                    conflicts += 1
+
+        # Spread bonus
+        spread_bonus = sum(date_used) / self.num_exams
+        return (1 / (1 + conflicts)) * spread_bonus
+
+    def _overlap_fitness(self, dates, rooms):
+        """
+        fitness() for a calendar whose sessions overlap: an exam conflicts
+        with an earlier one of the same subject or room (or, with a conflict
+        graph, sharing students) in any slot overlapping its own.
+        """
+        num_dates = self.num_dates
+        date_overlaps = self.date_overlaps
+        subject_near_date = [0] * (len(self.subjects) * num_dates)
+        room_near_date = [0] * (self.num_rooms * num_dates)
+        date_used = [False] * num_dates
+        conflicts = 0
+        for date, room, subject in zip(dates, rooms, self.exam_subject):
+            # Counters hold the earlier exams overlapping each slot
+            subject_base = subject * num_dates
+            room_base = room * num_dates
+            if subject_near_date[subject_base + date]:
+                conflicts += 1
+            if room_near_date[room_base + date]:
+                conflicts += 1
+            for other in date_overlaps[date]:
+                subject_near_date[subject_base + other] += 1
+                room_near_date[room_base + other] += 1
+            date_used[date] = True
+        if self.conflict_edges is not None:
+            overlap_sets = self._overlap_sets
+            for exam, other in self.conflict_edges:
+                if dates[other] in overlap_sets[dates[exam]]:
+                    conflicts += 1
+
+        spread_bonus = sum(date_used) / self.num_exams
+        return (1 / (1 + conflicts)) * spread_bonus
+
+    def population_diversity(self, population):
+        """
+        Mean share of exams placed on a different (date, room) by two
+        schedules of the population: 0 when all are identical.
+        """
+        rows = len(population)
+        if rows < 2 or not self.num_exams:
+            return 0.0
+        size = self.num_dates * self.num_rooms
+        codes = np.empty((self.num_exams, rows), dtype=np.intp)
+        for row, schedule in enumerate(population):
+            codes[:, row] = np.frombuffer(schedule.dates, dtype=np.uint16).astype(np.intp) * self.num_rooms
+            codes[:, row] += np.frombuffer(schedule.rooms, dtype=np.uint16)
+        # Pairs of schedules that agree on an exam, from per-exam (date, room) counts
+        offsets = np.arange(self.num_exams, dtype=np.intp)[:, None] * size
+        counts = np.bincount((codes + offsets).ravel(), minlength=self.num_exams * size)
+        agreeing = (counts * (counts - 1) // 2).sum()
+        return float(1.0 - agreeing / (self.num_exams * rows * (rows - 1) // 2))
+
+
+class ScoredSchedule:
+    """A schedule as date and room index arrays, carrying its cached score (None until scored)."""
+    __slots__ = ('dates', 'rooms', 'score')
+
+    def __init__(self, dates, rooms, score=None):
+        self.dates = dates
+        self.rooms = rooms
+        self.score = score
@@ -0,0 +1,107 @@
+"""
+Split a timetable problem into independent parts and solve them separately.
+
+Two entries interact only through a shared teacher, room or section, and
+every penalty is counted per teacher, room, section or course. Connected
+components of that interaction graph can therefore be scheduled on their
+own and merged without changing the total score.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.timetable_ga import TimetableGeneticAlgorithm
+
+
+def split_components(entries):
+    """
+    Group entries into connected components of the teacher/room/section
+    interaction graph. Returns a list of entry lists, largest first.
+    """
+    # Union-find over teacher, room and section nodes
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for entry in entries:
+        nodes = [('teacher', entry['teacher']), ('room', entry['room']), ('section', entry['class_section'])]
+        for node in nodes:
+            parent.setdefault(node, node)
+        first = find(nodes[0])
+        for node in nodes[1:]:
+            parent[find(node)] = first
+
+    components = {}
+    for entry in entries:
+        components.setdefault(find(('section', entry['class_section'])), []).append(entry)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def _solve_component(ga, run_options):
+    """Run one component's genetic algorithm (executed in a worker process)."""
+    return ga.generate_optimized_timetable(**run_options)
+
+
+def build_component_gas(entries, lectures_per_course, max_lectures_per_day, lecture_duration,
+                        start_time, end_time, shift=None, seed=None, **ga_options):
+    """
+    Return one TimetableGeneticAlgorithm per connected component of entries,
+    largest first; with a seed, component i uses seed + i.
+    """
+    return [TimetableGeneticAlgorithm(
+        semester=None, shift=shift,
+        lectures_per_course=lectures_per_course,
+        max_lectures_per_day=max_lectures_per_day,
+        lecture_duration=lecture_duration,
+        start_time=start_time, end_time=end_time,
+        entries=component, seed=None if seed is None else seed + i,
+        **ga_options
+    ) for i, component in enumerate(split_components(entries))]
+
+
+def solve_and_merge(gas, workers=None, run_options=None):
+    """
+    Run independent genetic algorithms, in parallel when more than one worker
+    and GA are available, and merge their timetables into one dict keyed by
+    (course, section, i).
+    workers: Number of processes (defaults to the CPU count)
+    run_options: Keyword arguments for generate_optimized_timetable of every GA
+    """
+    run_options = run_options or {}
+    workers = min(workers or os.cpu_count() or 1, len(gas))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_component, gas, [run_options] * len(gas)))
+    else:
+        results = [_solve_component(ga, run_options) for ga in gas]
+
+    merged = {}
+    for result in results:
+        if result:
+            merged.update(result)
+    return merged
+
+
+def generate_decomposed_timetable(entries, lectures_per_course, max_lectures_per_day, lecture_duration,
+                                  start_time, end_time, workers=None, run_options=None, **ga_options):
+    """
+    Solve each connected component of entries with its own genetic algorithm
+    and merge the results into one timetable dict keyed by (course, section, i).
+    entries: Timetable entries as returned by load_timetable
+    lectures_per_course, max_lectures_per_day, lecture_duration, start_time,
+    end_time: as for TimetableGeneticAlgorithm
+    workers: Number of processes solving components in parallel (defaults to the CPU count)
+    run_options: Keyword arguments for generate_optimized_timetable of every component
+    ga_options: Further TimetableGeneticAlgorithm options (population_size, seed, ...);
+    with a seed, component i uses seed + i
+    """
+    if not entries:
+        raise ValueError("No timetable entries to schedule.")
+    gas = build_component_gas(entries, lectures_per_course, max_lectures_per_day, lecture_duration,
+                              start_time, end_time, **ga_options)
+    return solve_and_merge(gas, workers, run_options)
@@ -0,0 +1,136 @@
+"""
+Constructive graph-colouring (DSatur) timetable builder.
+
+Lectures are the vertices of a conflict graph, with an edge between two
+lectures that share a teacher, room or section; time slots are the colours.
+"""
+import heapq
+from array import array
+
+
+def group_conflict_graph(num_vertices, vertex_groups):
+    """
+    Return one set of neighbouring vertex indices per vertex, linking every
+    two vertices that share a group key.
+    vertex_groups: iterable of (vertex, iterable of group keys)
+    """
+    members = {}
+    for vertex, keys in vertex_groups:
+        for key in keys:
+            members.setdefault(key, []).append(vertex)
+    neighbours = [set() for _ in range(num_vertices)]
+    for vertices in members.values():
+        for vertex in vertices:
+            neighbours[vertex].update(vertices)
+    for vertex, adjacent in enumerate(neighbours):
+        adjacent.discard(vertex)
+    return neighbours
+
+
+def build_conflict_graph(problem):
+    """Return one set of neighbouring lecture indices per lecture of the problem."""
+    return group_conflict_graph(problem.num_lectures, (
+        (lecture, (('room', problem.lecture_room[lecture]),
+                   ('teacher', problem.lecture_teacher[lecture]),
+                   ('section', problem.lecture_section[lecture])))
+        for lecture in range(problem.num_lectures)))
+
+
+def dsatur_colour(neighbours, allowed_slots, slot_key, on_assign=None, rng=None, slot_overlaps=None):
+    """
+    Generic DSatur driver: colour every vertex of the graph with a slot and
+    return the slot-index array. The next vertex is always the uncoloured
+    one whose neighbours already use the most distinct slots (ties: most
+    neighbours); it gets the slot with the smallest slot_key.
+    neighbours: one set of neighbouring vertex indices per vertex
+    allowed_slots: allowed_slots(vertex) -> candidate slots of the vertex
+    slot_key: slot_key(vertex, slot, clashes) -> sort key of a candidate,
+    where clashes is the number of coloured neighbours already using the slot
+    on_assign: optional on_assign(vertex, slot) called after each assignment
+    rng: optional random.Random to break ties randomly (deterministic if None)
+    slot_overlaps: optional list of the slots overlapping each slot (itself
+    included); a neighbour in any of them then counts as using the slot
+    """
+    num_vertices = len(neighbours)
+
+    def tie_break():
+        return rng.random() if rng is not None else 0
+
+    colours = array('H', bytes(2 * num_vertices))
+    coloured = [False] * num_vertices
+    # Per vertex: slot -> number of coloured neighbours using it
+    neighbour_slots = [{} for _ in range(num_vertices)]
+
+    # Max-heap on (saturation, degree) with lazy deletion of stale entries
+    heap = [(0, -len(neighbours[vertex]), tie_break(), vertex) for vertex in range(num_vertices)]
+    heapq.heapify(heap)
+
+    while heap:
+        saturation, _, _, vertex = heapq.heappop(heap)
+        if coloured[vertex] or -saturation != len(neighbour_slots[vertex]):
+            continue
+
+        used = neighbour_slots[vertex]
+        best_slot, best_key = None, None
+        for slot in allowed_slots(vertex):
+            key = slot_key(vertex, slot, used.get(slot, 0))
+            if best_key is None or key < best_key:
+                best_slot, best_key = slot, key
+
+        colours[vertex] = best_slot
+        coloured[vertex] = True
+        if on_assign is not None:
+            on_assign(vertex, best_slot)
+
+        blocked = slot_overlaps[best_slot] if slot_overlaps is not None else (best_slot,)
+        for other in neighbours[vertex]:
+            if coloured[other]:
+                continue
+            counts = neighbour_slots[other]
+            saturated = False
+            for slot in blocked:
+                counts[slot] = counts.get(slot, 0) + 1
+                saturated = saturated or counts[slot] == 1
+            if saturated:
+                heapq.heappush(heap, (-len(counts), -len(neighbours[other]), tie_break(), other))
+
+    return colours
+
+
+def dsatur_genome(problem, rng=None, neighbours=None):
+    """
+    Colour the conflict graph with the DSatur heuristic and return a genome.
+    The next lecture is always the uncoloured one whose neighbours already
+    use the most distinct slots (ties: most neighbours). It gets a slot no
+    neighbour uses and whose day still has room under MAX_LECTURES_PER_DAY
+    for its course, preferring the least loaded day for its course, section
+    and teacher. If no such slot exists, the slot with the fewest clashing
+    neighbours is used.
+    rng: optional random.Random to break ties randomly (deterministic if None)
+    neighbours: optional conflict graph from build_conflict_graph, to reuse it
+    """
+    if neighbours is None:
+        neighbours = build_conflict_graph(problem)
+    num_days = problem.num_days
+    slot_day = problem.slot_day
+    max_per_day = problem.MAX_LECTURES_PER_DAY
+    all_slots = range(problem.num_slots)
+    course_day_counts = [0] * (len(problem.courses) * num_days)
+    section_day_counts = [0] * (len(problem.sections) * num_days)
+    teacher_day_counts = [0] * (len(problem.teachers) * num_days)
+
+    def slot_key(lecture, slot, clashes):
+        day = slot_day[slot]
+        course_count = course_day_counts[problem.lecture_course[lecture] * num_days + day]
+        return (clashes > 0 or course_count >= max_per_day, clashes, course_count,
+                section_day_counts[problem.lecture_section[lecture] * num_days + day],
+                teacher_day_counts[problem.lecture_teacher[lecture] * num_days + day],
+                rng.random() if rng is not None else 0, slot)
+
+    def on_assign(lecture, slot):
+        day = slot_day[slot]
+        course_day_counts[problem.lecture_course[lecture] * num_days + day] += 1
+        section_day_counts[problem.lecture_section[lecture] * num_days + day] += 1
+        teacher_day_counts[problem.lecture_teacher[lecture] * num_days + day] += 1
+
+    return dsatur_colour(neighbours, lambda lecture: all_slots, slot_key, on_assign, rng)
@@ -0,0 +1,145 @@
+"""
+Student-conflict graph and graph-colouring exam scheduler.
+
+Exams are the vertices, with an edge between two exams whose students
+overlap: their courses are taught to a common class section (or, with
+cohorts, to the same semester and shift) in the timetable. Slots of an
+ExamSlotDomain are the colours, so a proper colouring has no student clash.
+"""
+import random
+
+from algorithms.datesheet_ga import DatesheetGeneticAlgorithm
+from algorithms.dsatur import dsatur_colour, group_conflict_graph
+from algorithms.exam_slots import build_exam_domain
+
+
+def student_groups(enrolments, cohorts=True):
+    """
+    Return course name -> set of student groups taking it.
+    enrolments: timetable entries with 'course', 'class_section', 'semester'
+    and 'shift' (as returned by db.timetable_db.load_timetable)
+    cohorts: also treat every semester and shift as one group of students
+    """
+    groups = {}
+    for entry in enrolments:
+        course_groups = groups.setdefault(str(entry['course']).strip(), set())
+        course_groups.add(('section', entry['class_section']))
+        if cohorts:
+            course_groups.add(('cohort', entry['semester'], entry['shift']))
+    return groups
+
+
+def build_exam_conflict_graph(exams, enrolments, cohorts=True):
+    """
+    Return one set of neighbouring exam indices per exam: exams whose
+    subjects are courses sharing a class section (or semester and shift
+    when cohorts is set). Subjects without enrolments have no edges.
+    """
+    groups = student_groups(enrolments, cohorts)
+    return group_conflict_graph(len(exams), (
+        (exam, groups.get(str(entry['subject']).strip(), ())) for exam, entry in enumerate(exams)))
+
+
+def count_clashes(dates, neighbours, slot_overlaps=None):
+    """
+    Number of conflict graph edges whose two exams share a slot, or with
+    slot_overlaps (see ExamSlotDomain) sit in slots overlapping in time.
+    """
+    if slot_overlaps is None:
+        return sum(1 for exam, adjacent in enumerate(neighbours)
+                   for other in adjacent if other > exam and dates[other] == dates[exam])
+    overlap_sets = [frozenset(overlaps) for overlaps in slot_overlaps]
+    return sum(1 for exam, adjacent in enumerate(neighbours)
+               for other in adjacent if other > exam and dates[other] in overlap_sets[dates[exam]])
+
+
+def build_room_subject_graph(exams):
+    """Return one set of neighbouring exam indices per exam: exams in the same room or of the same subject."""
+    return group_conflict_graph(len(exams), (
+        (exam, (('room', entry['room']), ('subject', entry['subject']))) for exam, entry in enumerate(exams)))
+
+
+def colour_exams(exams, slot_domain, neighbours, rng=None):
+    """
+    Assign every exam one of its allowed slots ('slots' key) with the DSatur
+    heuristic and return (slot index array, student clashes, room/subject
+    clashes). Besides the
+    student edges, exams in the same room or of the same subject may not
+    share a slot; neighbours in slots overlapping in time clash too. The next exam is always the uncoloured one whose neighbours
+    use the most distinct slots (ties: most neighbours); it gets a slot no
+    neighbour uses, preferring days with fewer exams of its students and
+    then less loaded days. If every allowed slot clashes, the slot with the
+    fewest clashing neighbours is used.
+    rng: optional random.Random to break ties randomly (deterministic if None)
+    """
+    num_exams = len(exams)
+    slot_day = slot_domain.slot_day
+    room_subject = build_room_subject_graph(exams)
+    hard = [adjacent | neighbours[exam] for exam, adjacent in enumerate(room_subject)]
+
+    # Per exam: day -> number of coloured student neighbours on it
+    neighbour_days = [{} for _ in range(num_exams)]
+    day_load = [0] * slot_domain.num_days
+
+    def slot_key(exam, slot, clashes):
+        day = slot_day[slot]
+        return (clashes, neighbour_days[exam].get(day, 0), day_load[day],
+                rng.random() if rng is not None else 0, slot)
+
+    def on_assign(exam, slot):
+        day = slot_day[slot]
+        day_load[day] += 1
+        for other in neighbours[exam]:
+            neighbour_days[other][day] = neighbour_days[other].get(day, 0) + 1
+
+    dates = dsatur_colour(hard, lambda exam: exams[exam]['slots'], slot_key, on_assign, rng,
+                          slot_domain.slot_overlaps)
+    return (dates, count_clashes(dates, neighbours, slot_domain.slot_overlaps),
+            count_clashes(dates, room_subject, slot_domain.slot_overlaps))
+
+
+def schedule_exams(entries, enrolments, holidays=(), cohorts=True, refine_generations=0, seed=None,
+                   workers=None, **ga_options):
+    """
+    Build a datesheet for UI entries by colouring the student-conflict graph.
+    entries: UI datesheet entries (see algorithms.exam_slots)
+    enrolments: timetable entries linking courses to class sections
+    holidays: dates without exams
+    cohorts: also keep courses of the same semester and shift apart
+    refine_generations: if > 0, run the genetic algorithm for this many
+    generations from the colouring to improve the spread; its result is only
+    used if it has no more student clashes and no more room/subject clashes
+    than the colouring
+    seed: seed for tie breaking and the genetic algorithm
+    workers: worker processes for the genetic algorithm
+    ga_options: further DatesheetGeneticAlgorithm options (e.g. population_size)
+
+    Returns (domain, schedule, stats); schedule is the list of exam dicts
+    with 'date' set to a slot label of domain, and stats a dict with
+    'student_clashes', 'hard_clashes' (exams sharing a room or subject in
+    overlapping slots), 'conflict_edges' and 'refined'.
+    """
+    domain, exams = build_exam_domain(entries, holidays)
+    neighbours = build_exam_conflict_graph(exams, enrolments, cohorts)
+    rng = random.Random(seed) if seed is not None else None
+    dates, clashes, hard_clashes = colour_exams(exams, domain, neighbours, rng)
+    schedule = [dict(exam, date=domain.labels[slot]) for exam, slot in zip(exams, dates)]
+    stats = {
+        'student_clashes': clashes,
+        'hard_clashes': hard_clashes,
+        'conflict_edges': sum(len(adjacent) for adjacent in neighbours) // 2,
+        'refined': False,
+    }
+
+    if refine_generations > 0 and exams:
+        ga = DatesheetGeneticAlgorithm(exams, max_generations=refine_generations, seed=seed, slot_domain=domain,
+                                       conflict_graph=neighbours, initial_schedule=schedule, **ga_options)
+        refined = ga.run(workers=workers)
+        refined_dates = [domain.slot_index[exam['date']] for exam in refined]
+        refined_clashes = count_clashes(refined_dates, neighbours, domain.slot_overlaps)
+        # The GA also moves exams between rooms
+        refined_hard = count_clashes(refined_dates, build_room_subject_graph(refined), domain.slot_overlaps)
+        if refined_clashes <= clashes and refined_hard <= hard_clashes:
+            schedule = refined
+            stats.update(student_clashes=refined_clashes, hard_clashes=refined_hard, refined=True)
+    return domain, schedule, stats
@@ -0,0 +1,126 @@
+"""
+Calendar-aware exam slot domain built from the datesheet UI's date ranges.
+
+Every exam day (weekends and holidays skipped) is combined with every
+exam session (a start and end time) into a slot with a compact index.
+Dates and times are parsed once here; the genetic algorithm only ever sees
+slot indices. Entries may use different session times; slot_overlaps
+tells which slots of a day intersect in time, so a room or student booked
+in one of them counts as booked in all of them.
+"""
+from datetime import date, datetime, timedelta
+
+DATE_FORMAT = '%Y-%m-%d'
+TIME_FORMAT = '%H:%M'
+
+
+def _parse_date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, DATE_FORMAT).date()
+
+
+def _minutes(time_text):
+    parsed = datetime.strptime(time_text, TIME_FORMAT)
+    return parsed.hour * 60 + parsed.minute
+
+
+class ExamSlotDomain:
+    def __init__(self, entries, holidays=(), weekend_days=(5, 6)):
+        """
+        entries: UI datesheet entries, dicts with 'start_date', 'end_date'
+        ('YYYY-MM-DD'), 'start_time', 'end_time' ('HH:MM'), 'subjects' and 'room'
+        holidays: Dates ('YYYY-MM-DD' strings or date objects) without exams
+        weekend_days: Weekdays without exams (Monday is 0)
+
+        Sessions are the distinct (start_time, end_time) pairs of the entries,
+        days are all exam days covered by any entry's date range.
+        """
+        holidays = {_parse_date(day) for day in holidays}
+        weekend_days = set(weekend_days)
+
+        sessions = set()
+        days = set()
+        for entry in entries:
+            sessions.add((_minutes(entry['start_time']), _minutes(entry['end_time'])))
+            days.update(self._exam_days(entry, holidays, weekend_days))
+        self.days = sorted(days)
+        self.sessions = sorted(sessions)
+        self.num_days = len(self.days)
+        self.num_sessions = len(self.sessions)
+        self.num_slots = self.num_days * self.num_sessions
+        self._holidays = holidays
+        self._weekend_days = weekend_days
+        self._day_index = {day: i for i, day in enumerate(self.days)}
+
+        # Slot i is day i // num_sessions, session i % num_sessions
+        self.slot_day = [slot // self.num_sessions for slot in range(self.num_slots)] if self.num_sessions else []
+        self.slot_session = [slot % self.num_sessions for slot in range(self.num_slots)] if self.num_sessions else []
+        self.labels = [f"{self.days[day].strftime(DATE_FORMAT)} {self.session_label(session)}"
+                       for day, session in zip(self.slot_day, self.slot_session)]
+        self.slot_index = {label: slot for slot, label in enumerate(self.labels)}
+
+        # Per slot: the slots of the same day whose [start, end) intersects it (itself included)
+        session_overlaps = [[other for other, (start2, end2) in enumerate(self.sessions)
+                             if start < end2 and start2 < end]
+                            for start, end in self.sessions]
+        self.slot_overlaps = [tuple(slot - session + other for other in session_overlaps[session])
+                              for slot, session in enumerate(self.slot_session)]
+
+    @staticmethod
+    def _exam_days(entry, holidays, weekend_days):
+        """Exam days of an entry's date range, in order."""
+        day = _parse_date(entry['start_date'])
+        end = _parse_date(entry['end_date'])
+        days = []
+        while day <= end:
+            if day.weekday() not in weekend_days and day not in holidays:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def session_label(self, session):
+        start, end = self.sessions[session]
+        return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+    def entry_slots(self, entry):
+        """Slot indices an entry's exams may use: its exam days x sessions inside its time window."""
+        start, end = _minutes(entry['start_time']), _minutes(entry['end_time'])
+        sessions = [i for i, (s, e) in enumerate(self.sessions) if s >= start and e <= end]
+        return [self._day_index[day] * self.num_sessions + session
+                for day in self._exam_days(entry, self._holidays, self._weekend_days)
+                for session in sessions]
+
+    def explode(self, entries):
+        """
+        Turn UI entries into one exam dict per subject, with the keys the
+        genetic algorithm expects ('date', 'subject', 'room', 'time') plus the
+        entry's own fields. 'date' starts as the entry's first allowed slot and
+        'slots' lists all of them. Raises ValueError for an entry whose range
+        has no exam day.
+        """
+        exams = []
+        for entry in entries:
+            slots = self.entry_slots(entry)
+            if not slots:
+                raise ValueError(f"No exam day between {entry['start_date']} and {entry['end_date']} "
+                                 f"for {', '.join(entry['subjects'])} (weekends and holidays are skipped).")
+            for subject in entry['subjects']:
+                exam = {key: value for key, value in entry.items() if key != 'subjects'}
+                exam.update({
+                    'subject': subject,
+                    'date': self.labels[slots[0]],
+                    'time': f"{entry['start_time']}-{entry['end_time']}",
+                    'slots': slots,
+                })
+                exams.append(exam)
+        return exams
+
+    def describe(self, label):
+        """(date 'YYYY-MM-DD', session 'HH:MM-HH:MM') of a slot label."""
+        slot = self.slot_index[label]
+        return self.days[self.slot_day[slot]].strftime(DATE_FORMAT), self.session_label(self.slot_session[slot])
+
+
+def build_exam_domain(entries, holidays=(), weekend_days=(5, 6)):
+    """Return (ExamSlotDomain, exploded exam dicts) for UI datesheet entries."""
+    domain = ExamSlotDomain(entries, holidays, weekend_days)
+    return domain, domain.explode(entries)
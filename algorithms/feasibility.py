@@ -0,0 +1,61 @@
+"""
+Fast hard-constraint feasibility pre-check for a timetable problem.
+
+Finds pigeonhole-style impossibilities before any search runs, so an
+impossible configuration fails in milliseconds instead of after a full run.
+"""
+from collections import Counter
+
+
+class InfeasibleTimetableError(ValueError):
+    """Raised when a timetable problem cannot possibly be scheduled without conflicts."""
+
+    def __init__(self, issues):
+        """issues: list of dicts from find_infeasibilities"""
+        self.issues = issues
+        super().__init__(format_issues(issues))
+
+
+def find_infeasibilities(problem):
+    """
+    Return one dict per violated hard constraint of a TimetableProblem:
+    {'kind': 'teacher' | 'room' | 'section' | 'course', 'name': ...,
+    'required': ..., 'available': ...}
+    - a teacher, room or section needs more lectures than there are slots
+    - LECTURES_PER_COURSE exceeds MAX_LECTURES_PER_DAY x days (name None)
+    An empty list means no obvious infeasibility was found.
+    """
+    issues = []
+    for kind, names, lecture_ids in (('teacher', problem.teachers, problem.lecture_teacher),
+                                     ('room', problem.rooms, problem.lecture_room),
+                                     ('section', problem.sections, problem.lecture_section)):
+        for index, count in sorted(Counter(lecture_ids).items()):
+            if count > problem.num_slots:
+                issues.append({'kind': kind, 'name': names[index],
+                               'required': count, 'available': problem.num_slots})
+
+    per_week = problem.MAX_LECTURES_PER_DAY * problem.num_days
+    if problem.num_lectures and problem.LECTURES_PER_COURSE > per_week:
+        issues.append({'kind': 'course', 'name': None,
+                       'required': problem.LECTURES_PER_COURSE, 'available': per_week})
+    return issues
+
+
+def check_feasibility(problem):
+    """Raise InfeasibleTimetableError if find_infeasibilities reports anything."""
+    issues = find_infeasibilities(problem)
+    if issues:
+        raise InfeasibleTimetableError(issues)
+
+
+def format_issues(issues):
+    """Human-readable, one line per issue."""
+    lines = []
+    for issue in issues:
+        if issue['kind'] == 'course':
+            lines.append(f"Lectures per course ({issue['required']}) exceeds max lectures per day "
+                         f"x days ({issue['available']}).")
+        else:
+            lines.append(f"{issue['kind'].capitalize()} {issue['name']} needs {issue['required']} "
+                         f"lectures but only {issue['available']} time slots exist.")
+    return "Timetable is infeasible:\n" + "\n".join(lines)
@@ -0,0 +1,72 @@
+"""
+Joint timetable generation for every semester and shift of the institution.
+"""
+from algorithms.decomposition import build_component_gas, solve_and_merge
+from algorithms.slot_model import parse_time
+from db.timetable_db import load_timetable
+
+
+def group_entries_by_shift(entries, shift_windows):
+    """
+    Split entries into independent groups, one per shift, after checking that
+    shifts sharing a teacher or room do not have overlapping daily windows
+    (a shared teacher could otherwise be double-booked across groups).
+    Returns a dict shift -> list of entries.
+    """
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry['shift'], []).append(entry)
+
+    missing = [shift for shift in groups if shift not in shift_windows]
+    if missing:
+        raise ValueError(f"No daily time window given for shift(s): {', '.join(missing)}")
+
+    shifts = list(groups)
+    for i, first in enumerate(shifts):
+        for second in shifts[i + 1:]:
+            start1, end1 = (parse_time(t) for t in shift_windows[first])
+            start2, end2 = (parse_time(t) for t in shift_windows[second])
+            if start1 >= end2 or start2 >= end1:
+                continue
+            teachers = {e['teacher'] for e in groups[first]} & {e['teacher'] for e in groups[second]}
+            rooms = {e['room'] for e in groups[first]} & {e['room'] for e in groups[second]}
+            if teachers or rooms:
+                shared = sorted(map(str, teachers | rooms))
+                raise ValueError(
+                    f"Shifts {first} and {second} overlap in time and share teachers/rooms: {', '.join(shared)}"
+                )
+    return groups
+
+
+def generate_global_timetable(shift_windows, lectures_per_course, max_lectures_per_day, lecture_duration,
+                              workers=None, run_options=None, **ga_options):
+    """
+    Generate one timetable covering all semesters and shifts in the database.
+    shift_windows: dict shift -> (daily start time, daily end time), e.g.
+    {'Morning': ('8:00 AM', '1:00 PM'), 'Evening': ('1:00 PM', '5:00 PM')}
+    lectures_per_course, max_lectures_per_day, lecture_duration: as for TimetableGeneticAlgorithm
+    workers: Number of processes solving independent parts in parallel (defaults to the CPU count)
+    run_options: Keyword arguments for generate_optimized_timetable of every part
+    ga_options: Further TimetableGeneticAlgorithm options (population_size, seed, ...);
+    with a seed, part i uses seed + i
+
+    All semesters of a shift are solved together, so a teacher or room
+    shared between semesters is never double-booked. Each shift group is
+    further split into its independent components (see decomposition); all
+    parts are solved in parallel and merged into a single timetable dict
+    keyed by (course, section, i).
+    """
+    entries = load_timetable()
+    if not entries:
+        raise ValueError("No timetable entries found in the database.")
+    groups = group_entries_by_shift(entries, shift_windows)
+
+    seed = ga_options.pop('seed', None)
+    gas = []
+    for shift, group in groups.items():
+        start_time, end_time = shift_windows[shift]
+        gas.extend(build_component_gas(
+            group, lectures_per_course, max_lectures_per_day, lecture_duration, start_time, end_time,
+            shift=shift, seed=None if seed is None else seed + len(gas), **ga_options
+        ))
+    return solve_and_merge(gas, workers, run_options)
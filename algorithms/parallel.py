@@ -0,0 +1,38 @@
+"""
+Process-pool helpers for spreading genetic algorithm work across CPU cores.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+# Algorithm instance held by each worker process
+_worker_algorithm = None
+
+
+def _init_worker(algorithm):
+    """Receive the (read-only) algorithm and its problem data once per worker."""
+    global _worker_algorithm
+    _worker_algorithm = algorithm
+
+
+def _run_chunk(method_name, chunk):
+    """Process one chunk with the named method of the worker's algorithm."""
+    return getattr(_worker_algorithm, method_name)(chunk)
+
+
+def create_pool(algorithm, workers):
+    """Start a process pool whose workers each get a copy of the algorithm."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(algorithm,))
+
+
+def map_chunks(pool, method_name, items, workers):
+    """
+    Split items into one chunk per worker, run algorithm.<method_name>(chunk)
+    in the pool and return the concatenated results in the original order.
+    """
+    if not items:
+        return []
+    size = -(-len(items) // workers)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    results = []
+    for chunk_result in pool.map(_run_chunk, [method_name] * len(chunks), chunks):
+        results.extend(chunk_result)
+    return results
@@ -0,0 +1,158 @@
+"""
+Portfolio solving: race several timetable engines and seeds in worker processes.
+
+All runs share the best score found so far. A run whose own best is still
+far behind it once part of the time limit has passed gives up, freeing its
+process for a queued strategy. As soon as one run reaches a zero penalty,
+or the time limit expires, every other run is cancelled and returns its
+best timetable so far.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from algorithms.solvers import build_problem, create_solver
+
+# Shared state held by each worker process
+_cancel_event = None
+_best_score = None
+
+
+def default_strategies(count):
+    """
+    Return count (engine name, options) pairs: the GA with different seeds and
+    mutation rates, interleaved with simulated annealing and tabu search.
+    """
+    mutation_rates = [0.15, 0.25, 0.1, 0.35]
+    strategies = []
+    for i in range(count):
+        if i % 4 == 1:
+            strategies.append(('annealing', {'seed': i}))
+        elif i % 4 == 3:
+            strategies.append(('tabu', {'seed': i}))
+        else:
+            rate = mutation_rates[(i // 2) % len(mutation_rates)]
+            strategies.append(('ga', {'seed': i, 'mutation_rate': rate, 'mutation_mode': 'targeted'}))
+    return strategies
+
+
+def _init_worker(cancel_event, best_score):
+    global _cancel_event, _best_score
+    _cancel_event = cancel_event
+    _best_score = best_score
+
+
+def _share_score(score):
+    """Publish a score to the other runs and cancel them all once it is zero."""
+    with _best_score.get_lock():
+        if score < _best_score.value:
+            _best_score.value = score
+    if score == 0:
+        _cancel_event.set()
+
+
+class _RunToken:
+    """Cancel token of one run: set once the race is over or the run has fallen far behind."""
+
+    def __init__(self, give_up_ratio, grace_seconds):
+        self.give_up_ratio = give_up_ratio
+        self.grace_seconds = grace_seconds
+        self.gave_up = False
+
+    def on_progress(self, step, best_score, elapsed):
+        _share_score(best_score)
+        if (self.give_up_ratio is not None and self.grace_seconds is not None and elapsed >= self.grace_seconds
+                and best_score > self.give_up_ratio * max(_best_score.value, 1)):
+            self.gave_up = True
+
+    def is_set(self):
+        return self.gave_up or _cancel_event.is_set()
+
+
+def _run_strategy(name, options, entries, config, time_budget_seconds, give_up_ratio, give_up_after):
+    """Run one engine in a worker process and return (timetable, stats)."""
+    grace_seconds = time_budget_seconds * give_up_after if time_budget_seconds is not None else None
+    token = _RunToken(give_up_ratio, grace_seconds)
+    solver = create_solver(
+        name, time_budget_seconds=time_budget_seconds, cancel_token=token,
+        on_progress=token.on_progress, **options
+    )
+    timetable, stats = solver.solve(entries, config)
+    if stats['score'] is not None:
+        _share_score(stats['score'])
+    stats['options'] = options
+    stats['gave_up'] = token.gave_up
+    return timetable, stats
+
+
+def solve_portfolio(entries, config, strategies=None, workers=None, time_budget_seconds=60,
+                    give_up_ratio=2.0, give_up_after=0.25):
+    """
+    Race strategies concurrently and return (best timetable, stats).
+    entries: Timetable entries as returned by load_timetable
+    config: Generation config, see solvers.build_problem
+    strategies: List of (engine name, options) pairs; default_strategies(workers) if None
+    workers: Number of worker processes (defaults to the CPU count)
+    time_budget_seconds: Wall-clock limit for the whole race (None: until all runs finish)
+    give_up_ratio: A run stops early once its best score is more than this many
+    times the shared best score (None: runs never give up)
+    give_up_after: Fraction of time_budget_seconds a run gets before it may
+    give up (runs without a time budget never give up)
+    stats holds the winning 'engine', its 'score', the shared 'best_score'
+    and one stats dict per strategy under 'runs' (None for a run that failed;
+    'gave_up' marks runs that stopped early for falling behind).
+    """
+    if not entries:
+        raise ValueError("No timetable entries to schedule.")
+    # Fail fast (InfeasibleTimetableError) before starting any process
+    build_problem(entries, config)
+    workers = workers or os.cpu_count() or 1
+    if strategies is None:
+        strategies = default_strategies(workers)
+
+    cancel_event = multiprocessing.Event()
+    best_score = multiprocessing.Value('q', 2 ** 62)
+    runs = [None] * len(strategies)
+    best = None
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cancel_event, best_score)) as pool:
+        futures = {
+            pool.submit(_run_strategy, name, options, entries, config, time_budget_seconds,
+                        give_up_ratio, give_up_after): i
+            for i, (name, options) in enumerate(strategies)
+        }
+        deadline = time.perf_counter() + time_budget_seconds if time_budget_seconds is not None else None
+        pending = set(futures)
+        while pending:
+            # Each run stops itself once its own time budget is used; the race
+            # deadline also cancels runs that started late.
+            timeout = None
+            if deadline is not None and not cancel_event.is_set():
+                timeout = max(0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                cancel_event.set()
+                continue
+            for future in done:
+                try:
+                    timetable, stats = future.result()
+                except Exception as ex:
+                    errors.append(str(ex))
+                    continue
+                runs[futures[future]] = stats
+                if stats['score'] is not None and (best is None or stats['score'] < best[1]['score']):
+                    best = (timetable, stats)
+            if best is not None and best[1]['score'] == 0:
+                cancel_event.set()
+
+    if best is None:
+        raise RuntimeError("All portfolio runs failed: " + "; ".join(errors))
+    timetable, winner = best
+    return timetable, {
+        'engine': winner['engine'],
+        'score': winner['score'],
+        'best_score': best_score.value,
+        'runs': runs,
+    }
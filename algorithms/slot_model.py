@@ -0,0 +1,131 @@
+"""
+Integer model of the weekly lecture time slots.
+
+A slot is an index into flat lookup tables holding its day index and its
+start and end minute after midnight. Slot strings such as
+"Monday 08:00 AM-09:00 AM" are only produced for display and for the dict
+timetables handed to the UI and database.
+"""
+from datetime import datetime
+
+DEFAULT_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def parse_time(time_text):
+    """Minutes after midnight for a time such as '8:00 AM'."""
+    parsed = datetime.strptime(time_text.strip(), "%I:%M %p")
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_time(minutes):
+    """Format minutes after midnight as '08:00 AM'."""
+    hour, minute = divmod(minutes % (24 * 60), 60)
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+class SlotModel:
+    def __init__(self, days, slot_day, slot_start, slot_end):
+        """
+        days: Day names, in order
+        slot_day: Day index of every slot
+        slot_start: Start minute (after midnight) of every slot
+        slot_end: End minute of every slot
+
+        Within a day, slots must be ordered by start time.
+        """
+        self.days = list(days)
+        self.slot_day = list(slot_day)
+        self.slot_start = list(slot_start)
+        self.slot_end = list(slot_end)
+        self.num_days = len(self.days)
+        self.num_slots = len(self.slot_day)
+
+        # day -> slots, and the position of each slot within its day
+        self.day_slots = [[] for _ in self.days]
+        self.slot_period = []
+        for slot, day in enumerate(self.slot_day):
+            self.slot_period.append(len(self.day_slots[day]))
+            self.day_slots[day].append(slot)
+        self.periods_per_day = max((len(slots) for slots in self.day_slots), default=0)
+
+        # Contiguous slots: the previous and next period of the same day
+        self.adjacent = [[] for _ in range(self.num_slots)]
+        for slots in self.day_slots:
+            for first, second in zip(slots, slots[1:]):
+                self.adjacent[first].append(second)
+                self.adjacent[second].append(first)
+
+        self._labels = None
+        self._label_index = None
+
+    @classmethod
+    def from_config(cls, start_time, end_time, lecture_duration, break_duration=10, days=None):
+        """
+        Slots of lecture_duration minutes, separated by break_duration minutes,
+        between the daily start_time and end_time (e.g. '8:00 AM') on each day.
+        """
+        days = DEFAULT_DAYS if days is None else days
+        start = parse_time(start_time)
+        slot_duration = lecture_duration + break_duration
+        slots_per_day = max(0, (parse_time(end_time) - start) // slot_duration)
+        if slots_per_day == 0:
+            days = []
+        slot_day, slot_start, slot_end = [], [], []
+        for day in range(len(days)):
+            for period in range(slots_per_day):
+                slot_day.append(day)
+                slot_start.append(start + period * slot_duration)
+                slot_end.append(start + period * slot_duration + lecture_duration)
+        return cls(days, slot_day, slot_start, slot_end)
+
+    @classmethod
+    def from_labels(cls, labels):
+        """
+        Build the model from slot strings ("Day HH:MM AM-HH:MM PM"), keeping
+        their order. A label without a valid time range gets start and end minute 0.
+        """
+        days, day_index = [], {}
+        slot_day, slot_start, slot_end = [], [], []
+        for label in labels:
+            day, _, time_range = label.partition(' ')
+            if not time_range:
+                day = 'Unknown'
+            if day not in day_index:
+                day_index[day] = len(days)
+                days.append(day)
+            slot_day.append(day_index[day])
+            start, _, end = time_range.partition('-')
+            try:
+                start, end = parse_time(start), parse_time(end)
+            except ValueError:
+                start = end = 0
+            slot_start.append(start)
+            slot_end.append(end)
+        model = cls(days, slot_day, slot_start, slot_end)
+        model._labels = list(labels)
+        return model
+
+    def time_range(self, slot):
+        """Display string of the slot's time, e.g. '08:00 AM-09:00 AM'."""
+        return f"{format_time(self.slot_start[slot])}-{format_time(self.slot_end[slot])}"
+
+    def label(self, slot):
+        """Display string of the slot, e.g. 'Monday 08:00 AM-09:00 AM'."""
+        return self.labels()[slot]
+
+    def labels(self):
+        """Display strings of all slots, formatted once and cached."""
+        if self._labels is None:
+            self._labels = [f"{self.days[day]} {self.time_range(slot)}" for slot, day in enumerate(self.slot_day)]
+        return self._labels
+
+    def index(self, label):
+        """Slot index of a display string (KeyError if it is not a slot of the model)."""
+        if self._label_index is None:
+            self._label_index = {text: slot for slot, text in enumerate(self.labels())}
+        return self._label_index[label]
+
+    def period_ranges(self):
+        """Display strings of the daily periods, in time order (from the longest day)."""
+        longest = max(self.day_slots, key=len, default=[])
+        return [self.time_range(slot) for slot in longest]
@@ -0,0 +1,33 @@
+"""
+Per-generation snapshots yielded by the genetic algorithms' evolve() generators.
+"""
+
+
+class GenerationSnapshot:
+    """
+    Lightweight view of one generation. best is a handle on the best
+    individual so far (not a copy); diversity is only computed when read.
+    """
+    __slots__ = ('generation', 'best_score', 'best', 'elapsed', '_diversity_fn', '_diversity')
+
+    def __init__(self, generation, best_score, best, elapsed, diversity_fn):
+        """
+        generation: Generation number, starting at 0
+        best_score: Score of the best individual so far
+        best: The best individual so far
+        elapsed: Seconds since the run started
+        diversity_fn: Callable returning the population diversity (0 to 1)
+        """
+        self.generation = generation
+        self.best_score = best_score
+        self.best = best
+        self.elapsed = elapsed
+        self._diversity_fn = diversity_fn
+        self._diversity = None
+
+    @property
+    def diversity(self):
+        """Mean normalized Hamming distance between the generation's individuals."""
+        if self._diversity is None:
+            self._diversity = self._diversity_fn()
+        return self._diversity
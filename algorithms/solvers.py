@@ -0,0 +1,244 @@
+"""
+Pluggable timetable solver engines sharing the genetic algorithm's penalty model.
+
+Every engine takes the timetable entries (as returned by load_timetable) plus
+the generation config and returns (timetable dict, stats dict).
+"""
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+
+from algorithms.dsatur import dsatur_genome
+from algorithms.feasibility import check_feasibility
+from algorithms.timetable_ga import TimetableGeneticAlgorithm
+from algorithms.slot_model import SlotModel
+from algorithms.timetable_problem import TimetableProblem, TimetableState
+
+
+def build_problem(entries, config):
+    """
+    Build the integer-encoded problem instance; raises InfeasibleTimetableError
+    if it cannot be scheduled without conflicts.
+    config: dict with 'lectures_per_course', 'max_lectures_per_day',
+    'lecture_duration', 'start_time' and 'end_time'
+    """
+    slot_model = SlotModel.from_config(config['start_time'], config['end_time'], config['lecture_duration'])
+    if not slot_model.num_slots:
+        raise ValueError("Could not generate any valid time slots with the given parameters.")
+    problem = TimetableProblem(entries, slot_model, config['lectures_per_course'], config['max_lectures_per_day'])
+    check_feasibility(problem)
+    return problem
+
+
+class TimetableSolver(ABC):
+    """Common interface of the engines; subclasses implement _search."""
+    name = None
+
+    def __init__(self, seed=None, time_budget_seconds=None, on_progress=None, cancel_token=None):
+        """
+        seed: Seed for the random number generator, for reproducible runs
+        time_budget_seconds: Stop once this much wall-clock time has passed
+        on_progress: Optional callback on_progress(step, best_score, elapsed)
+        cancel_token: Optional threading.Event (or any object with is_set())
+        """
+        self.seed = seed
+        self.time_budget_seconds = time_budget_seconds
+        self.on_progress = on_progress
+        self.cancel_token = cancel_token
+
+    def solve(self, entries, config):
+        """Return (best timetable dict, stats dict) for the entries and config."""
+        if not entries:
+            raise ValueError("No timetable entries to schedule.")
+        self._start = time.perf_counter()
+        timetable, stats = self._search(entries, config)
+        stats['engine'] = self.name
+        stats['elapsed'] = time.perf_counter() - self._start
+        return timetable, stats
+
+    @abstractmethod
+    def _search(self, entries, config):
+        """Return (best timetable dict, stats dict); the engine-specific part of solve()."""
+
+    def _should_stop(self):
+        """True once the time budget is used up or the run was cancelled."""
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            return True
+        return (self.time_budget_seconds is not None
+                and time.perf_counter() - self._start >= self.time_budget_seconds)
+
+    def _report(self, step, best_score):
+        if self.on_progress is not None:
+            self.on_progress(step, best_score, time.perf_counter() - self._start)
+
+
+class GeneticSolver(TimetableSolver):
+    """The existing TimetableGeneticAlgorithm behind the solver interface."""
+    name = 'ga'
+
+    def __init__(self, workers=None, **ga_options):
+        """
+        workers: Worker processes for generate_optimized_timetable
+        ga_options: seed, time_budget_seconds, on_progress, cancel_token and any
+        TimetableGeneticAlgorithm option (population_size, mutation_rate, ...)
+        """
+        super().__init__(ga_options.pop('seed', None), ga_options.pop('time_budget_seconds', None),
+                         ga_options.pop('on_progress', None), ga_options.pop('cancel_token', None))
+        self.workers = workers
+        self.ga_options = ga_options
+
+    def _search(self, entries, config):
+        ga = TimetableGeneticAlgorithm(
+            semester=None, shift=None, entries=entries, seed=self.seed,
+            lectures_per_course=config['lectures_per_course'],
+            max_lectures_per_day=config['max_lectures_per_day'],
+            lecture_duration=config['lecture_duration'],
+            start_time=config['start_time'], end_time=config['end_time'],
+            **self.ga_options
+        )
+        timetable = ga.generate_optimized_timetable(
+            workers=self.workers, time_budget_seconds=self.time_budget_seconds,
+            on_progress=self.on_progress, cancel_token=self.cancel_token
+        )
+        stats = {
+            'score': ga.problem.fitness(ga.problem.encode(timetable)) if timetable else None,
+            'generations': len(ga.best_fitness_history),
+            'history': ga.best_fitness_history,
+            'fitness_stats': ga.fitness_stats,
+        }
+        return timetable, stats
+
+
+class _TrajectorySolver(TimetableSolver):
+    """Single-solution search starting from a DSatur colouring."""
+
+    def __init__(self, max_iterations, **options):
+        super().__init__(**options)
+        self.max_iterations = max_iterations
+
+    def _search(self, entries, config):
+        problem = build_problem(entries, config)
+        rng = random.Random(self.seed)
+        state = TimetableState(problem, dsatur_genome(problem))
+        best_genome, best_score, stats = self._trajectory(problem, state, rng)
+        stats['score'] = best_score
+        return problem.decode(best_genome), stats
+
+    @abstractmethod
+    def _trajectory(self, problem, state, rng):
+        """Improve state in place; return (best genome, best score, stats dict)."""
+
+    @staticmethod
+    def _pick_lecture(state, rng, tries=3):
+        """Random lecture, biased towards lectures that are in conflict."""
+        lecture = rng.randrange(len(state.genome))
+        for _ in range(tries):
+            if state.lecture_conflicted(lecture):
+                break
+            lecture = rng.randrange(len(state.genome))
+        return lecture
+
+
+class SimulatedAnnealingSolver(_TrajectorySolver):
+    """Simulated annealing over single-lecture moves with geometric cooling."""
+    name = 'annealing'
+
+    def __init__(self, max_iterations=200000, initial_temperature=50.0, cooling_rate=0.9995,
+                 min_temperature=0.05, **options):
+        """
+        max_iterations: Number of proposed moves
+        initial_temperature: Starting temperature (in penalty points)
+        cooling_rate: Factor applied to the temperature after every move
+        min_temperature: The temperature never drops below this value
+        options: seed, time_budget_seconds, on_progress, cancel_token
+        """
+        super().__init__(max_iterations, **options)
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.min_temperature = min_temperature
+
+    def _trajectory(self, problem, state, rng):
+        best_genome, best_score = state.genome[:], state.score
+        temperature = self.initial_temperature
+        accepted = 0
+        iteration = 0
+        for iteration in range(1, self.max_iterations + 1):
+            if best_score == 0:
+                break
+            lecture = self._pick_lecture(state, rng)
+            slot = rng.randrange(problem.num_slots)
+            delta = state.move_delta(lecture, slot)
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                state.move(lecture, slot)
+                accepted += 1
+                if state.score < best_score:
+                    best_genome, best_score = state.genome[:], state.score
+            temperature = max(self.min_temperature, temperature * self.cooling_rate)
+            if iteration % 1000 == 0:
+                self._report(iteration, best_score)
+                if self._should_stop():
+                    break
+        return best_genome, best_score, {'iterations': iteration, 'accepted': accepted}
+
+
+class TabuSearchSolver(_TrajectorySolver):
+    """Tabu search: best non-tabu move among sampled lectures, every iteration."""
+    name = 'tabu'
+
+    def __init__(self, max_iterations=5000, tenure=10, candidate_lectures=10, **options):
+        """
+        max_iterations: Number of moves made
+        tenure: Iterations during which a lecture may not return to a slot it left
+        candidate_lectures: Lectures whose moves to every slot are evaluated per iteration
+        options: seed, time_budget_seconds, on_progress, cancel_token
+        """
+        super().__init__(max_iterations, **options)
+        self.tenure = tenure
+        self.candidate_lectures = candidate_lectures
+
+    def _trajectory(self, problem, state, rng):
+        best_genome, best_score = state.genome[:], state.score
+        tabu_until = {}  # (lecture, slot) -> iteration until which the move is tabu
+        iteration = 0
+        for iteration in range(1, self.max_iterations + 1):
+            if best_score == 0:
+                break
+            best_move, best_delta = None, None
+            for _ in range(self.candidate_lectures):
+                lecture = self._pick_lecture(state, rng)
+                for slot in range(problem.num_slots):
+                    if slot == state.genome[lecture]:
+                        continue
+                    delta = state.move_delta(lecture, slot)
+                    # Aspiration: a tabu move is allowed if it beats the best so far
+                    if tabu_until.get((lecture, slot), 0) > iteration and state.score + delta >= best_score:
+                        continue
+                    if best_delta is None or delta < best_delta:
+                        best_move, best_delta = (lecture, slot), delta
+            if best_move is None:
+                continue
+            lecture, slot = best_move
+            tabu_until[(lecture, state.genome[lecture])] = iteration + self.tenure
+            state.move(lecture, slot)
+            if state.score < best_score:
+                best_genome, best_score = state.genome[:], state.score
+            if iteration % 100 == 0:
+                self._report(iteration, best_score)
+                if self._should_stop():
+                    break
+        return best_genome, best_score, {'iterations': iteration}
+
+
+SOLVERS = {
+    GeneticSolver.name: GeneticSolver,
+    SimulatedAnnealingSolver.name: SimulatedAnnealingSolver,
+    TabuSearchSolver.name: TabuSearchSolver,
+}
+
+
+def create_solver(name, **options):
+    """Create the engine registered under name ('ga', 'annealing' or 'tabu')."""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}'. Choose one of: {', '.join(SOLVERS)}")
+    return SOLVERS[name](**options)
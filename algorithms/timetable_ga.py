@@ -1,164 +1,248 @@
 """
 Genetic algorithm for generating class timetables with improved distribution of lectures.
 """
+import copy
+import functools
+import itertools
 import random
-from datetime import datetime, timedelta
-from db.timetable_db import load_timetable
-
-"""
-Genetic algorithm for generating class timetables with improved distribution of lectures.
-"""
-import random
-from datetime import datetime, timedelta
+import time
+from array import array
+import numpy as np
 from db.timetable_db import load_timetable
+from algorithms.checkpoint import fingerprint, load_checkpoint, save_checkpoint
+from algorithms.feasibility import check_feasibility
+from algorithms.slot_model import SlotModel
+from algorithms.snapshot import GenerationSnapshot
+from algorithms.timetable_problem import TimetableProblem, TimetableState, ScoredGenome
+from algorithms.parallel import create_pool, map_chunks
+from algorithms.dsatur import build_conflict_graph, dsatur_genome
 
 class TimetableGeneticAlgorithm:
-    def __init__(self, semester, shift, lectures_per_course, max_lectures_per_day, lecture_duration, start_time, end_time, population_size=100, max_generations=100, mutation_rate=0.15):
+    def __init__(self, semester, shift, lectures_per_course, max_lectures_per_day, lecture_duration, start_time, end_time, population_size=100, max_generations=100, mutation_rate=0.15, debug=False, seed=None, mutation_mode='random', repair=False, memetic_elites=0, local_search_moves=200, local_search_seconds=None, entries=None, dsatur_seed_fraction=0.0, adaptive_mutation=False, diversity_threshold=0.05, restart_fraction=0.5, feasibility_check=True, crossover_mode='uniform'):
         """
-        semester: Semester for which the timetable is being generated
-        shift: Shift (e.g., Morning or Evening) for which the timetable is being generated
+        semester: Semester for which the timetable is being generated (None for all semesters)
+        shift: Shift (e.g., Morning or Evening) for which the timetable is being generated (None for all shifts)
         lectures_per_course: Number of lectures per course per week
         max_lectures_per_day: Maximum lectures of the same course per day
         lecture_duration: Duration of each lecture in minutes
         start_time: Daily start time for lectures
         end_time: Daily end time for lectures
         population_size: Number of candidate timetables per generation
-        max_generations: Number of generations to evolve
+        max_generations: Number of generations to evolve (None for no limit when a time budget is used)
         mutation_rate: Probability of mutation per assignment
+        debug: Cross-check every incremental fitness update against a full recomputation
+        seed: Seed for the random number generator, for reproducible runs
+        mutation_mode: 'random' mutates any gene, 'targeted' only genes involved in conflicts
+        repair: Greedily move conflicted lectures to better free slots before a child is inserted
+        memetic_elites: Number of top timetables refined by local search after every generation (0 disables it)
+        local_search_moves: Moves tried per generation by the local search, shared by the refined elites
+        local_search_seconds: Optional wall-clock limit per generation for the local search
+        entries: Timetable entries to schedule instead of loading them for semester and shift
+        dsatur_seed_fraction: Fraction of the initial population built by the DSatur graph-colouring heuristic
+        adaptive_mutation: Scale the mutation rate with population diversity, replace duplicate
+        individuals and re-randomise part of the population when diversity collapses or the best
+        score stalls, instead of stopping after 20 generations without improvement
+        diversity_threshold: Diversity (mean normalized Hamming distance) below which part of the population is re-randomised
+        restart_fraction: Fraction of the non-elite individuals re-randomised on a restart
+        feasibility_check: Raise InfeasibleTimetableError right away when a teacher, room or section
+        needs more lectures than there are slots, or lectures_per_course cannot fit the week
+        crossover_mode: 'uniform' (each gene from either parent), 'one_point' or 'two_point'
+        (a contiguous run of genes from the second parent)
         """
-        self.entries = load_timetable(semester, shift)
+        self.entries = entries if entries is not None else load_timetable(semester, shift)
         if not self.entries:
             raise ValueError("No timetable entries found for the specified semester and shift.")
         
         self.POPULATION_SIZE = population_size
         self.MAX_GENERATIONS = max_generations
         self.MUTATION_RATE = mutation_rate
+        self.DEBUG = debug
+        self.rng = random.Random(seed)
+        if mutation_mode not in ('random', 'targeted'):
+            raise ValueError("Mutation mode must be either 'random' or 'targeted'.")
+        self.MUTATION_MODE = mutation_mode
+        if crossover_mode not in ('uniform', 'one_point', 'two_point'):
+            raise ValueError("Crossover mode must be 'uniform', 'one_point' or 'two_point'.")
+        self.CROSSOVER_MODE = crossover_mode
+        self.REPAIR = repair
+        self.MEMETIC_ELITES = memetic_elites
+        self.LOCAL_SEARCH_MOVES = local_search_moves
+        self.LOCAL_SEARCH_SECONDS = local_search_seconds
+        self.DSATUR_SEED_FRACTION = dsatur_seed_fraction
+        if not 0 <= restart_fraction <= 1:
+            raise ValueError("Restart fraction must be between 0 and 1.")
+        self.ADAPTIVE_MUTATION = adaptive_mutation
+        self.DIVERSITY_THRESHOLD = diversity_threshold
+        self.RESTART_FRACTION = restart_fraction
+        self.STALL_GENERATIONS = 20
         self.LECTURES_PER_COURSE = lectures_per_course
         self.MAX_LECTURES_PER_DAY = max_lectures_per_day
         self.LECTURE_DURATION = lecture_duration
         self.START_TIME = start_time
         self.END_TIME = end_time
         
+        # Integer slot model; slot strings are only formatted for the dict timetables
+        self.slot_model = SlotModel.from_config(self.START_TIME, self.END_TIME, self.LECTURE_DURATION)
+        
         # Extract unique values from entries
         self.unique_time_slots = self._generate_time_slots()
         self.unique_rooms = list({e['room'] for e in self.entries})
         self.unique_teachers = list({e['teacher'] for e in self.entries})
         
         # Group time slots by day for distribution checks
-        self.time_slots_by_day = {}
-        for ts in self.unique_time_slots:
-            day = ts.split()[0]
-            if day not in self.time_slots_by_day:
-                self.time_slots_by_day[day] = []
-            self.time_slots_by_day[day].append(ts)
+        self.time_slots_by_day = {
+            day: [self.unique_time_slots[slot] for slot in slots]
+            for day, slots in zip(self.slot_model.days, self.slot_model.day_slots)
+        }
         
         # Extract unique courses and sections
         self.unique_courses = list({e['course'] for e in self.entries})
         self.unique_sections = list({e['class_section'] for e in self.entries})
         
+        # Integer-encoded view of the problem used during evolution
+        self.problem = TimetableProblem(self.entries, self.slot_model,
+                                        self.LECTURES_PER_COURSE, self.MAX_LECTURES_PER_DAY)
+        if feasibility_check:
+            check_feasibility(self.problem)
+        
+        # Warm start: population seed and the lectures allowed to move
+        # (None means a cold start where every lecture may move)
+        self._warm_start_genome = None
+        self._movable_lectures = None
+        self._movable_set = None
+        
         # Add tracking for best fitness
         self.best_fitness_history = []
+        
+        # Individuals carry their own score; hits are score lookups served from
+        # it, misses are full fitness evaluations
+        self.fitness_stats = {'hits': 0, 'misses': 0}
+        self.local_search_stats = {'tried': 0, 'accepted': 0}
+        
+        # Adaptive mode: diversity and mutation rate per generation
+        self.diversity_history = []
+        self.mutation_rate_history = []
+        self.diversity_stats = {'duplicates': 0, 'restarts': 0}
 
     def _generate_time_slots(self):
         """Generate time slots based on the provided start and end times."""
-        start_dt = datetime.strptime(self.START_TIME, "%I:%M %p")
-        end_dt = datetime.strptime(self.END_TIME, "%I:%M %p")
-        break_duration = 10  # Break duration in minutes
-        
-        time_slots = []
-        total_minutes = ((end_dt.hour * 60 + end_dt.minute) - 
-                         (start_dt.hour * 60 + start_dt.minute))
-        slot_duration = self.LECTURE_DURATION + break_duration
-        slots_per_day = total_minutes // slot_duration
-        
-        if slots_per_day <= 0:
-            return []
-        
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-        for day in days:
-            current_time = start_dt
-            for _ in range(slots_per_day):
-                end_time = (datetime(1, 1, 1, current_time.hour, current_time.minute) + 
-                            timedelta(minutes=self.LECTURE_DURATION))
-                slot_start = current_time.strftime("%I:%M %p")
-                slot_end = end_time.strftime("%I:%M %p")
-                time_slot = f"{day} {slot_start}-{slot_end}"
-                time_slots.append(time_slot)
-                current_time = (datetime(1, 1, 1, current_time.hour, current_time.minute) + 
-                                timedelta(minutes=slot_duration))
-        return time_slots
+        return self.slot_model.labels()
 
     def generate_initial_population(self):
-        """Generate initial population of random timetables."""
+        """Generate initial population of random timetables, encoded as scored states."""
         population = []
-        for _ in range(self.POPULATION_SIZE):
-            population.append(self._create_random_timetable())
+        for genome in self._initial_genomes():
+            population.append(self._new_state(genome))
         return population
 
+    def _initial_genomes(self):
+        """Random (and DSatur) genomes for a cold start, variations of the seed for a warm start."""
+        if self._warm_start_genome is None:
+            genomes = []
+            dsatur_count = min(self.POPULATION_SIZE, round(self.DSATUR_SEED_FRACTION * self.POPULATION_SIZE))
+            if dsatur_count:
+                # The first seed is the deterministic colouring, the rest break ties randomly
+                neighbours = build_conflict_graph(self.problem)
+                genomes.append(dsatur_genome(self.problem, neighbours=neighbours))
+                while len(genomes) < dsatur_count:
+                    genomes.append(dsatur_genome(self.problem, self.rng, neighbours))
+            while len(genomes) < self.POPULATION_SIZE:
+                genomes.append(self._create_random_genome())
+            return genomes
+
+        # Keep the seed itself, and re-place the movable lectures on free slots for the rest
+        seed = TimetableState(self.problem, self._warm_start_genome[:])
+        genomes = [seed.genome[:]]
+        while len(genomes) < self.POPULATION_SIZE:
+            state = seed.copy()
+            for lecture in self.rng.sample(self._movable_lectures, len(self._movable_lectures)):
+                free = state.free_slots(lecture)
+                if free:
+                    state.move(lecture, self.rng.choice(free))
+            genomes.append(state.genome)
+        return genomes
+
+    def _movable(self, lectures):
+        """Drop the lectures a warm-started run must not move."""
+        if self._movable_set is None:
+            return lectures
+        return [lecture for lecture in lectures if lecture in self._movable_set]
+
+    def _new_state(self, genome):
+        """Fully evaluate a genome and wrap it in a state that carries its score."""
+        self.fitness_stats['misses'] += 1
+        return TimetableState(self.problem, genome, self.DEBUG)
+
+    def _fitness(self, state):
+        """Return the score carried by an individual, never re-scoring it."""
+        self.fitness_stats['hits'] += 1
+        return state.score
+
     def _create_random_timetable(self):
         """Create a single random timetable assignment with better distribution."""
-        timetable = {}
-        courses_by_section = {}
-            
-        # First pass: group courses by section
-        for entry in self.entries:
-            key = (entry['course'], entry['class_section'])
-            if entry['class_section'] not in courses_by_section:
-                courses_by_section[entry['class_section']] = []
-            courses_by_section[entry['class_section']].append(entry['course'])
-        
-        # Second pass: create multiple entries per course (lectures_per_course times)
-        for entry in self.entries:
-            course = entry['course']
-            section = entry['class_section']
-            key = (course, section)
-            
-            # Create multiple lecture instances for each course
-            for i in range(self.LECTURES_PER_COURSE):
-                lecture_key = (course, section, i)
-                
-                # Try to distribute across different days
-                available_slots = self._get_distributed_time_slot(timetable, course, section)
-                chosen_slot = random.choice(available_slots) if available_slots else random.choice(self.unique_time_slots)
-                
-                timetable[lecture_key] = {
-                    'time_slot': chosen_slot,
-                    'room': entry['room'],
-                    'teacher': entry['teacher']
-                }
-                
-        return timetable
-
-    def _get_distributed_time_slot(self, timetable, course, section):
-        """Get time slots that help distribute this course across different days."""
-        # Count how many lectures for this course are on each day
-        days_used = {}
-        for key, details in timetable.items():
-            # Ensure the key has the expected structure
-            if len(key) >= 2 and key[0] == course and key[1] == section:
-                day = details['time_slot'].split()[0]
-                if day not in days_used:
-                    days_used[day] = 0
-                days_used[day] += 1
-
-        # Prioritize days with fewer lectures of this course
-        preferred_days = []
-        for day in self.time_slots_by_day:
-            count = days_used.get(day, 0)
-            if count < self.MAX_LECTURES_PER_DAY:
-                preferred_days.append((day, count))
-
-        # Sort by usage (least used first)
-        preferred_days.sort(key=lambda x: x[1])
-
-        # If we have preferred days, return slots from those days
-        if preferred_days:
-            chosen_day = preferred_days[0][0]
-            return self.time_slots_by_day[chosen_day]
-
-        # Otherwise return all slots
-        return self.unique_time_slots
+        return self.problem.decode(self._create_random_genome())
+
+    def _create_random_genome(self):
+        """
+        Build one random genome lecture by lecture. Per-course day counters
+        and room/teacher/section slot-occupancy bitsets are kept up to date
+        while building, so every lecture is placed in O(slots per day) and
+        lands on a slot that is still free for its room, teacher and section.
+        """
+        problem = self.problem
+        num_days = problem.num_days
+        course_day_counts = [0] * (len(problem.courses) * num_days)
+        room_busy = [0] * len(problem.rooms)
+        teacher_busy = [0] * len(problem.teachers)
+        section_busy = [0] * len(problem.sections)
+        genome = array('H', bytes(2 * problem.num_lectures))
+
+        for lecture in range(problem.num_lectures):
+            room = problem.lecture_room[lecture]
+            teacher = problem.lecture_teacher[lecture]
+            section = problem.lecture_section[lecture]
+            base = problem.lecture_course[lecture] * num_days
+            busy = room_busy[room] | teacher_busy[teacher] | section_busy[section]
 
+            # Prioritize days with fewer lectures of this course (least used first)
+            preferred_days = sorted(
+                (day for day in range(num_days) if course_day_counts[base + day] < self.MAX_LECTURES_PER_DAY),
+                key=lambda day: course_day_counts[base + day]
+            )
+
+            # Pick a free slot on the least used day that still has one,
+            # falling back to any free slot and finally to any slot at all
+            chosen_slot = None
+            for day in preferred_days:
+                free = [slot for slot in problem.day_slots[day] if not (busy >> slot) & 1]
+                if free:
+                    chosen_slot = self.rng.choice(free)
+                    break
+            if chosen_slot is None:
+                free = [slot for slot in range(problem.num_slots) if not (busy >> slot) & 1]
+                if free:
+                    chosen_slot = self.rng.choice(free)
+                elif preferred_days:
+                    chosen_slot = self.rng.choice(problem.day_slots[preferred_days[0]])
+                else:
+                    chosen_slot = self.rng.randrange(problem.num_slots)
+
+            genome[lecture] = chosen_slot
+            course_day_counts[base + problem.slot_day[chosen_slot]] += 1
+            bit = 1 << chosen_slot
+            room_busy[room] |= bit
+            teacher_busy[teacher] |= bit
+            section_busy[section] |= bit
+
+        return genome
+
+    def generate_dsatur_timetable(self):
+        """
+        Fast deterministic alternative to the genetic algorithm: build one
+        timetable with the DSatur graph-colouring heuristic and return it
+        (score it with calculate_fitness if needed).
+        """
+        return self.problem.decode(dsatur_genome(self.problem))
 
     def calculate_fitness(self, timetable):
         """Calculate fitness score: lower is better (fewer conflicts)."""
@@ -245,87 +329,622 @@ class TimetableGeneticAlgorithm:
 
         return score
 
-    def crossover(self, parent1, parent2):
-        """Combine two parent timetables into one child via uniform crossover."""
-        child = {}
-        keys = list(parent1.keys())
-        
-        for k in keys:
-            # 50% chance of inheriting from each parent
-            if random.random() < 0.5:
-                child[k] = parent1[k].copy()  # Use .copy() to avoid reference issues
+    def calculate_fitness_population(self, pop_matrix):
+        """
+        Score a whole (population x lectures) matrix of slot indices at once.
+        Penalties match calculate_fitness; see TimetableProblem.population_matrix.
+        """
+        return self.problem.fitness_population(pop_matrix)
+
+    def crossover(self, parent1, parent2, rng=None):
+        """
+        Combine two parents into one child genome (uniform, one-point or
+        two-point crossover, see CROSSOVER_MODE). The child is only a slot
+        array: parent1's slots with the genes picked by a numpy mask copied
+        over from parent2. Counters are built later, and only for the
+        mutation modes that need them.
+        """
+        genome = parent1.genome[:]
+        num_lectures = len(genome)
+        if num_lectures < 2:
+            return genome
+        mask = self._crossover_mask(rng or self.rng, num_lectures)
+        np.copyto(np.frombuffer(genome, dtype=np.uint16), np.frombuffer(parent2.genome, dtype=np.uint16),
+                  where=mask)
+        return genome
+
+    def _crossover_mask(self, rng, num_lectures):
+        """Boolean array marking the genes a child inherits from its second parent."""
+        if self.CROSSOVER_MODE == 'uniform':
+            # 50% chance of inheriting each slot from each parent, one random bit per gene
+            bits = rng.getrandbits(num_lectures).to_bytes((num_lectures + 7) // 8, 'little')
+            return np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=num_lectures,
+                                 bitorder='little').astype(bool)
+        mask = np.zeros(num_lectures, dtype=bool)
+        if self.CROSSOVER_MODE == 'one_point':
+            mask[rng.randrange(1, num_lectures):] = True
+        else:
+            first, second = sorted(rng.sample(range(num_lectures + 1), 2))
+            mask[first:second] = True
+        return mask
+
+    def mutate(self, state, rng=None, rate=None):
+        """
+        Randomly mutate some slot assignments in the state (in place).
+        state: TimetableState, or a plain genome in the 'random' mode
+        rate: Mutation probability per assignment (MUTATION_RATE if None)
+        """
+        # Only time slots are encoded, room and teacher assignments never change
+        rng = rng or self.rng
+        rate = self.MUTATION_RATE if rate is None else rate
+        num_slots = self.problem.num_slots
+        if self.MUTATION_MODE == 'targeted':
+            # Only move lectures that are still in conflict, preferably to a free slot
+            for lecture in self._movable(state.conflicted_lectures()):
+                if rng.random() < rate and state.lecture_conflicted(lecture):
+                    free = state.free_slots(lecture)
+                    state.move(lecture, rng.choice(free) if free else rng.randrange(num_slots))
+            return state
+        if not isinstance(state, TimetableState):
+            genome = state
+            for lecture in self._movable_lectures if self._movable_lectures is not None else range(len(genome)):
+                if rng.random() < rate:
+                    genome[lecture] = rng.randrange(num_slots)
+            return genome
+        lectures = self._movable_lectures if self._movable_lectures is not None else range(len(state.genome))
+        for lecture in lectures:
+            if rng.random() < rate:
+                state.move(lecture, rng.randrange(num_slots))
+        return state
+
+    def repair(self, state):
+        """Greedily move each conflicted lecture to the free slot that lowers the score most."""
+        for lecture in self._movable(state.conflicted_lectures()):
+            if not state.lecture_conflicted(lecture):
+                continue
+            best_slot, best_delta = None, 0
+            for slot in state.free_slots(lecture):
+                delta = state.move_delta(lecture, slot)
+                if delta < best_delta:
+                    best_slot, best_delta = slot, delta
+            if best_slot is not None:
+                state.move(lecture, best_slot)
+        return state
+
+    def local_search(self, state, max_moves, deadline=None):
+        """
+        First-improvement hill climbing on a state (in place). Each step tries
+        either moving one lecture to another slot or swapping the slots of two
+        lectures, scored with the incremental delta API, and keeps it only if
+        the score drops. Lectures in conflict are tried first.
+        Stops after max_moves tries or at the deadline (time.perf_counter value).
+        Returns (moves tried, moves accepted).
+        """
+        rng = self.rng
+        num_slots = self.problem.num_slots
+        movable = self._movable_lectures if self._movable_lectures is not None else range(len(state.genome))
+        candidates = self._movable(state.conflicted_lectures())
+        tried = accepted = 0
+        while tried < max_moves and state.score > 0 and movable:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            lecture = rng.choice(candidates) if candidates else rng.choice(movable)
+            tried += 1
+            if rng.random() < 0.5:
+                slot = rng.randrange(num_slots)
+                if state.move_delta(lecture, slot) < 0:
+                    state.move(lecture, slot)
+                    accepted += 1
+                    candidates = self._movable(state.conflicted_lectures())
             else:
-                child[k] = parent2[k].copy() 
-                
+                other = rng.choice(movable)
+                if state.swap_delta(lecture, other) < 0:
+                    state.swap(lecture, other)
+                    accepted += 1
+                    candidates = self._movable(state.conflicted_lectures())
+        return tried, accepted
+
+    def _refine_elites(self, scored):
+        """Memetic phase: refine the best MEMETIC_ELITES individuals and re-sort."""
+        count = min(self.MEMETIC_ELITES, len(scored))
+        deadline = None
+        if self.LOCAL_SEARCH_SECONDS is not None:
+            deadline = time.perf_counter() + self.LOCAL_SEARCH_SECONDS
+        moves_each = self.LOCAL_SEARCH_MOVES // count
+        refined = []
+        for individual, _ in scored[:count]:
+            # Refined on a copy, so earlier generations (and checkpoints) keep their
+            # individuals; parallel runs keep plain scored genomes, which need counters first
+            state = individual.copy() if isinstance(individual, TimetableState) else self._new_state(individual.genome[:])
+            tried, accepted = self.local_search(state, moves_each, deadline)
+            self.local_search_stats['tried'] += tried
+            self.local_search_stats['accepted'] += accepted
+            refined.append((state, self._fitness(state)))
+        return sorted(refined + scored[count:], key=lambda x: x[1])
+
+    def _breed(self, parent1, parent2, seed, rate=None):
+        """
+        Create one mutated child; its randomness comes only from seed. The
+        targeted mode and repair need conflict counters, so their children
+        become scored states; otherwise the child is an unscored ScoredGenome
+        (see _score_children).
+        """
+        rng = random.Random(seed)
+        genome = self.crossover(parent1, parent2, rng)
+        if self.MUTATION_MODE != 'targeted' and not self.REPAIR:
+            return ScoredGenome(self.mutate(genome, rng, rate), None)
+        child = self.mutate(TimetableState(self.problem, genome, self.DEBUG), rng, rate)
+        if self.REPAIR:
+            child = self.repair(child)
         return child
 
-    def mutate(self, timetable):
-        """Randomly mutate some assignments in the timetable."""
-        for key in list(timetable.keys()):
-            if random.random() < self.MUTATION_RATE:
-                # Only mutate time slots, keep room and teacher assignments
-                timetable[key]['time_slot'] = random.choice(self.unique_time_slots)
-        return timetable
+    def _score_children(self, children):
+        """Score the unscored children at once with the vectorized fitness."""
+        unscored = [child for child in children if child.score is None]
+        if unscored:
+            scores = self.problem.fitness_population(self.problem.population_matrix([c.genome for c in unscored]))
+            for child, score in zip(unscored, scores.tolist()):
+                child.score = score
+        return children
+
+    def _breed_chunk(self, tasks):
+        """
+        Worker side of parallel breeding. tasks holds (parent1 bytes,
+        parent2 bytes, seed, mutation rate) tuples; returns (child bytes, score) tuples.
+        """
+        children = self._score_children([
+            self._breed(ScoredGenome(self._genome_from_bytes(parent1_bytes), None),
+                        ScoredGenome(self._genome_from_bytes(parent2_bytes), None), seed, rate)
+            for parent1_bytes, parent2_bytes, seed, rate in tasks
+        ])
+        return [(child.genome.tobytes(), child.score) for child in children]
+
+    def _score_chunk(self, genomes):
+        """Worker side of parallel scoring: full fitness of each genome's bytes."""
+        return [self.problem.fitness(self._genome_from_bytes(data)) for data in genomes]
 
-    def generate_optimized_timetable(self):
-        """Run the genetic algorithm and return the best timetable found."""
+    @staticmethod
+    def _genome_from_bytes(data):
+        """Rebuild a slot-index genome from its compact serialized form."""
+        genome = array('H')
+        genome.frombytes(data)
+        return genome
+
+    def _reproduce(self, parent_pairs, pool, workers, rate=None):
+        """Breed one child per (parent1, parent2, seed), in parallel when a pool is given."""
+        if pool is None:
+            self.fitness_stats['misses'] += len(parent_pairs)
+            return self._score_children([self._breed(parent1, parent2, seed, rate)
+                                         for parent1, parent2, seed in parent_pairs])
+        tasks = [(parent1.genome.tobytes(), parent2.genome.tobytes(), seed, rate)
+                 for parent1, parent2, seed in parent_pairs]
+        self.fitness_stats['misses'] += len(tasks)
+        return [ScoredGenome(self._genome_from_bytes(data), score)
+                for data, score in map_chunks(pool, '_breed_chunk', tasks, workers)]
+
+    def generate_optimized_timetable(self, workers=None, time_budget_seconds=None, on_progress=None, cancel_token=None,
+                                     checkpoint_path=None, checkpoint_interval=10, resume_from=None):
+        """
+        Run the genetic algorithm and return the best timetable found.
+        workers: Number of worker processes for breeding and scoring children
+        (None or 1 runs serially). With a fixed seed the result is the same
+        as a serial run.
+        time_budget_seconds: Stop once this much wall-clock time has passed and
+        return the best timetable found so far
+        on_progress: Optional callback on_progress(generation, best_score, elapsed)
+        called after every generation
+        cancel_token: Optional threading.Event (or any object with is_set());
+        once it is set the run returns the best timetable found so far
+        checkpoint_path: Write a checkpoint to this file every checkpoint_interval
+        generations and when the run ends (also when it fails)
+        resume_from: Continue the run saved in this checkpoint file; with a fixed
+        seed the result is the same as an uninterrupted run
+        """
         if not self.entries:
             return None
+        best = None
+        for snapshot in self.evolve(workers, time_budget_seconds, cancel_token, checkpoint_path,
+                                    checkpoint_interval, resume_from, record_history=True):
+            best = snapshot.best
+            if on_progress is not None:
+                on_progress(snapshot.generation, snapshot.best_score, snapshot.elapsed)
+        # Converted back to the dict shape
+        return self.problem.decode(best.genome) if best is not None else None
+
+    def evolve(self, workers=None, time_budget_seconds=None, cancel_token=None, checkpoint_path=None,
+               checkpoint_interval=10, resume_from=None, record_history=False):
+        """
+        Generator running the genetic algorithm one generation at a time. After
+        every generation it yields a GenerationSnapshot (generation, best_score,
+        best individual so far, diversity, elapsed); stop iterating (or close
+        the generator) to stop the run. Options as for generate_optimized_timetable.
+        record_history: Append every generation's best score to best_fitness_history
+        """
+        if self.MAX_GENERATIONS is None and time_budget_seconds is None and cancel_token is None:
+            raise ValueError("Either max_generations, a time budget or a cancel token is required.")
+
+        run_control = (time_budget_seconds, cancel_token, checkpoint_path,
+                       checkpoint_interval, resume_from, record_history)
+        if workers and workers > 1:
+            with create_pool(self, workers) as pool:
+                yield from self._evolve(pool, workers, *run_control)
+        else:
+            yield from self._evolve(None, 1, *run_control)
 
-        population = self.generate_initial_population()
+    def _population_diversity(self, scored):
+        return self.problem.population_diversity(
+            self.problem.population_matrix([state.genome for state, _ in scored]))
+
+    def _checkpoint_fingerprint(self):
+        return fingerprint(self.problem.lecture_keys, self.problem.time_slots,
+                           self.LECTURES_PER_COURSE, self.MAX_LECTURES_PER_DAY)
+
+    def _evolve(self, pool, workers, time_budget_seconds=None, cancel_token=None, checkpoint_path=None,
+                checkpoint_interval=10, resume_from=None, record_history=False):
+        """Main generation loop shared by the serial and parallel modes."""
+        start = time.perf_counter()
+        self.fitness_stats = {'hits': 0, 'misses': 0}
+        self.local_search_stats = {'tried': 0, 'accepted': 0}
+        self.diversity_history = []
+        self.mutation_rate_history = []
+        self.diversity_stats = {'duplicates': 0, 'restarts': 0}
         best_fitness = float('inf')
         best_solution = None
         no_improvement_count = 0
-
-        for generation in range(self.MAX_GENERATIONS):
-            # Evaluate all solutions
-            scored = [(tt, self.calculate_fitness(tt)) for tt in population]
-            # Sort ascending by score (lower is better)
-            scored.sort(key=lambda x: x[1])
-            
-            current_best = scored[0]
-            self.best_fitness_history.append(current_best[1])
-            
-            # Check if we found a better solution
-            if current_best[1] < best_fitness:
-                best_fitness = current_best[1]
-                best_solution = current_best[0]
-                no_improvement_count = 0
+        first_generation = 0
+        if resume_from is not None:
+            saved = load_checkpoint(resume_from, 'timetable', self._checkpoint_fingerprint())
+            first_generation = saved['generation']
+            self.rng.setstate(saved['rng_state'])
+            self.best_fitness_history = list(saved['best_fitness_history'])
+            no_improvement_count = saved['no_improvement_count']
+            if saved['best'] is not None:
+                best_solution = ScoredGenome(self._genome_from_bytes(saved['best'][0]), saved['best'][1])
+                best_fitness = best_solution.score
+            if pool is None:
+                population = [self._new_state(self._genome_from_bytes(data)) for data, _ in saved['population']]
             else:
-                no_improvement_count += 1
-            
-            # If perfect (0 conflicts) or no improvement for many generations, return early
-            if current_best[1] == 0 or no_improvement_count > 20:
-                return best_solution
+                population = [ScoredGenome(self._genome_from_bytes(data), score) for data, score in saved['population']]
+        elif pool is None:
+            population = self.generate_initial_population()
+        else:
+            genomes = self._initial_genomes()
+            scores = map_chunks(pool, '_score_chunk', [genome.tobytes() for genome in genomes], workers)
+            self.fitness_stats['misses'] += len(genomes)
+            population = [ScoredGenome(genome, score) for genome, score in zip(genomes, scores)]
+
+        if self.MAX_GENERATIONS is not None:
+            generations = range(first_generation, self.MAX_GENERATIONS)
+        else:
+            generations = itertools.count(first_generation)
+        checkpoint_refs = None
+        try:
+            for generation in generations:
+                if checkpoint_path is not None:
+                    # References to the state at the start of this generation; only
+                    # serialized every interval and on exit
+                    checkpoint_refs = (generation, list(population), self.rng.getstate(),
+                                       len(self.best_fitness_history), best_solution, no_improvement_count)
+                    if generation > first_generation and generation % checkpoint_interval == 0:
+                        self._save_checkpoint(checkpoint_path, *checkpoint_refs)
+
+                # Evaluate all solutions
+                scored = [(state, self._fitness(state)) for state in population]
+                # Sort ascending by score (lower is better)
+                scored.sort(key=lambda x: x[1])
                 
-            # Select top performers (elitism)
-            elite_count = self.POPULATION_SIZE // 10  # Top 10%
-            elites = [tt for tt, _ in scored[:elite_count]]
-            
-            # Selection pool - use tournament selection
-            tournament_size = 3
-            
-            # Create new generation
-            new_pop = elites.copy()  # Keep elites
-            
-            # Fill the rest with crossover and mutation
-            while len(new_pop) < self.POPULATION_SIZE:
-                # Tournament selection for parents
-                parent1 = min(random.sample(population, tournament_size), 
-                            key=self.calculate_fitness)
-                parent2 = min(random.sample(population, tournament_size), 
-                            key=self.calculate_fitness)
+                # Optional memetic phase on the elites
+                if self.MEMETIC_ELITES > 0:
+                    scored = self._refine_elites(scored)
                 
-                # Create child via crossover
-                child = self.crossover(parent1, parent2)
+                current_best = scored[0]
+                if record_history:
+                    self.best_fitness_history.append(current_best[1])
                 
-                # Mutate
-                child = self.mutate(child)
+                # Check if we found a better solution
+                if current_best[1] < best_fitness:
+                    best_fitness = current_best[1]
+                    best_solution = current_best[0]
+                    no_improvement_count = 0
+                else:
+                    no_improvement_count += 1
                 
-                # Add to new population
-                new_pop.append(child)
+                yield GenerationSnapshot(generation, best_fitness, best_solution, time.perf_counter() - start,
+                                         functools.partial(self._population_diversity, scored))
                 
-            population = new_pop
+                # If perfect (0 conflicts) or no improvement for many generations, stop early;
+                # the adaptive mode re-randomises part of the population instead of giving up
+                restart = False
+                if current_best[1] == 0:
+                    return
+                if no_improvement_count > self.STALL_GENERATIONS:
+                    if not self.ADAPTIVE_MUTATION:
+                        return
+                    restart = True
+                    no_improvement_count = 0
+                
+                # Out of time or cancelled: the best found so far stands
+                if time_budget_seconds is not None and time.perf_counter() - start >= time_budget_seconds:
+                    return
+                if cancel_token is not None and cancel_token.is_set():
+                    return
+                if self.MAX_GENERATIONS is not None and generation == self.MAX_GENERATIONS - 1:
+                    return
+                    
+                population = self._next_generation(scored, pool, workers, restart)
+        finally:
+            if checkpoint_refs is not None:
+                self._save_checkpoint(checkpoint_path, *checkpoint_refs)
+
+    def _save_checkpoint(self, path, generation, population, rng_state, history_length, best_solution,
+                         no_improvement_count):
+        """Write the state captured at the start of a generation (see _evolve)."""
+        save_checkpoint(path, 'timetable', self._checkpoint_fingerprint(), {
+            'generation': generation,
+            'population': [(state.genome.tobytes(), state.score) for state in population],
+            'rng_state': rng_state,
+            'best_fitness_history': self.best_fitness_history[:history_length],
+            'best': (best_solution.genome.tobytes(), best_solution.score) if best_solution is not None else None,
+            'no_improvement_count': no_improvement_count,
+        })
+
+    def reoptimize_timetable(self, previous, pinned=(), stability_penalty=10, **run_options):
+        """
+        Re-solve after small edits, starting from a previously generated timetable.
+        previous: Timetable dict returned by an earlier run
+        pinned: Lecture keys (course, section, i) that must keep their previous slot
+        (a pinned lecture whose previous slot no longer exists is placed anew)
+        stability_penalty: Penalty for each unaffected lecture moved away from its previous slot
+        run_options: Passed on to generate_optimized_timetable
+        
+        Lectures that are new, whose room or teacher changed, or whose previous
+        slot no longer exists are affected. Only they and the lectures they
+        conflict with are searched; everything else stays put.
+        """
+        problem = self.problem
+        pinned = set(pinned)
+        seed = [0] * problem.num_lectures
+        affected = []
+        frozen = set()
+        for lecture, key in enumerate(problem.lecture_keys):
+            old = previous.get(key)
+            room = problem.rooms[problem.lecture_room[lecture]]
+            teacher = problem.teachers[problem.lecture_teacher[lecture]]
+            if old is None or old['time_slot'] not in problem.slot_index:
+                affected.append(lecture)
+                continue
+            seed[lecture] = problem.slot_index[old['time_slot']]
+            if key in pinned:
+                frozen.add(lecture)
+            elif old['room'] != room or old['teacher'] != teacher:
+                affected.append(lecture)
+
+        # Place the affected lectures greedily (taken out of the counters
+        # first, so lectures not placed yet add no load), then widen the
+        # search to everything they (and other remaining clashes) conflict with
+        state = TimetableState(problem, array('H', seed))
+        for lecture in affected:
+            state.unplace(lecture)
+        for lecture in affected:
+            best_slot = min(range(problem.num_slots), key=lambda slot: state.place_delta(lecture, slot))
+            state.place(lecture, best_slot)
+        movable = (set(affected) | set(state.conflicted_lectures())) - frozen
+
+        affected = set(affected)
+        weights = [0 if lecture in affected else stability_penalty for lecture in range(problem.num_lectures)]
+        self.problem = problem.with_stability(state.genome, weights)
+        self._warm_start_genome = state.genome
+        self._movable_lectures = sorted(movable)
+        self._movable_set = movable
+        try:
+            return self.generate_optimized_timetable(**run_options)
+        finally:
+            self.problem = problem
+            self._warm_start_genome = None
+            self._movable_lectures = None
+            self._movable_set = None
+
+    def _next_generation(self, scored, pool, workers, restart=False):
+        """
+        Build the next population from (individual, score) pairs sorted best first.
+        restart: Re-randomise part of the population (adaptive mode only)
+        """
+        population = [state for state, _ in scored]
+        rate = self.MUTATION_RATE
+        fresh_count = 0
+        if self.ADAPTIVE_MUTATION:
+            population, rate, fresh_count = self._adapt(population, restart)
+        
+        # Select top performers (elitism)
+        elite_count = self.POPULATION_SIZE // 10  # Top 10%
+        elites = population[:elite_count]
+        
+        # Selection pool - use tournament selection
+        tournament_size = min(3, len(population))
+        
+        # Create new generation
+        new_pop = elites.copy()  # Keep elites
+        
+        # Tournament selection for parents of the rest; each child gets
+        # its own seed so serial and parallel breeding give the same result
+        parent_pairs = []
+        while len(new_pop) + len(parent_pairs) + fresh_count < self.POPULATION_SIZE:
+            parent1 = min(self.rng.sample(population, tournament_size), 
+                        key=self._fitness)
+            parent2 = min(self.rng.sample(population, tournament_size), 
+                        key=self._fitness)
+            parent_pairs.append((parent1, parent2, self.rng.getrandbits(64)))
+        
+        # Fill the rest with crossover and mutation, then re-randomised individuals
+        new_pop.extend(self._reproduce(parent_pairs, pool, workers, rate))
+        while len(new_pop) < self.POPULATION_SIZE:
+            new_pop.append(self._new_state(self._fresh_genome(self.rng.choice(population))))
+        return new_pop
+
+    def _adapt(self, population, restart):
+        """
+        Adaptive mode: drop duplicate individuals, measure diversity and pick the
+        mutation rate for the next generation. The rate grows as diversity falls
+        (from half to four times MUTATION_RATE). Returns (unique population,
+        mutation rate, number of individuals to re-randomise); the duplicates are
+        replaced, and on a restart or a diversity collapse RESTART_FRACTION of the
+        non-elite individuals as well.
+        """
+        seen = set()
+        unique = []
+        for state in population:
+            key = state.genome.tobytes()
+            if key not in seen:
+                seen.add(key)
+                unique.append(state)
+        fresh_count = len(population) - len(unique)
+        self.diversity_stats['duplicates'] += fresh_count
+
+        diversity = self.problem.population_diversity(
+            self.problem.population_matrix([state.genome for state in unique]))
+        rate = min(1.0, self.MUTATION_RATE * min(4.0, max(0.5, 0.25 / max(diversity, 1e-9))))
+        self.diversity_history.append(diversity)
+        self.mutation_rate_history.append(rate)
+
+        if restart or diversity < self.DIVERSITY_THRESHOLD:
+            self.diversity_stats['restarts'] += 1
+            non_elite = self.POPULATION_SIZE - self.POPULATION_SIZE // 10
+            fresh_count = max(fresh_count, round(self.RESTART_FRACTION * non_elite))
+        return unique, rate, fresh_count
+
+    def _fresh_genome(self, state):
+        """
+        A re-randomised genome: a new random one on a cold start; on a warm start
+        a copy of the state with its movable lectures re-placed on free slots.
+        """
+        if self._movable_lectures is None:
+            return self._create_random_genome()
+        state = state.copy() if isinstance(state, TimetableState) else TimetableState(self.problem, state.genome[:])
+        for lecture in self.rng.sample(self._movable_lectures, len(self._movable_lectures)):
+            free = state.free_slots(lecture)
+            if free:
+                state.move(lecture, self.rng.choice(free))
+        return state.genome
+
+    def generate_island_timetable(self, islands=4, migration_interval=10, migrants=2,
+                                  topology='ring', mutation_rates=None, workers=None,
+                                  time_budget_seconds=None, cancel_token=None):
+        """
+        Evolve several independent sub-populations (islands), each in its own
+        process with its own seed, and exchange their best individuals every
+        migration_interval generations.
+        islands: Number of sub-populations, each of POPULATION_SIZE individuals
+        migration_interval: Generations between migrations
+        migrants: Number of top individuals each island sends per migration
+        topology: 'ring' (island i sends to island i+1) or 'all' (all-to-all)
+        mutation_rates: Optional list with one mutation rate per island
+        workers: Number of worker processes (defaults to one per island, 1 runs in-process)
+        time_budget_seconds: Stop after the first migration interval that ends
+        once this much wall-clock time has passed
+        cancel_token: Optional threading.Event (or any object with is_set());
+        checked after every migration interval
+        Returns (best timetable, list of per-island best fitness histories).
+        """
+        if topology not in ('ring', 'all'):
+            raise ValueError("Topology must be either 'ring' or 'all'.")
+        if mutation_rates is None:
+            mutation_rates = [self.MUTATION_RATE] * islands
+        if len(mutation_rates) != islands:
+            raise ValueError("Provide exactly one mutation rate per island.")
+        if self.MAX_GENERATIONS is None and time_budget_seconds is None and cancel_token is None:
+            raise ValueError("Either max_generations, a time budget or a cancel token is required.")
+        workers = workers or islands
+        start = time.perf_counter()
+
+        # (population as (genome bytes, score) sorted best first, RNG state, mutation rate)
+        island_states = [(None, random.Random(self.rng.getrandbits(64)).getstate(), rate)
+                         for rate in mutation_rates]
+        histories = [[] for _ in range(islands)]
+        best_fitness = float('inf')
+        best_genome = None
+        generation = 0
+
+        pool = create_pool(self, workers) if workers > 1 else None
+        try:
+            while (self.MAX_GENERATIONS is None or generation < self.MAX_GENERATIONS) and best_fitness > 0:
+                # Out of time or cancelled after an interval: the best found so far stands
+                if generation > 0:
+                    if time_budget_seconds is not None and time.perf_counter() - start >= time_budget_seconds:
+                        break
+                    if cancel_token is not None and cancel_token.is_set():
+                        break
+                generations = migration_interval
+                if self.MAX_GENERATIONS is not None:
+                    generations = min(migration_interval, self.MAX_GENERATIONS - generation)
+                tasks = [(population, rng_state, rate, generations)
+                         for population, rng_state, rate in island_states]
+                if pool is None:
+                    results = self._island_chunk(tasks)
+                else:
+                    results = map_chunks(pool, '_island_chunk', tasks, workers)
+                generation += generations
+
+                # Track each island's convergence and the global best
+                for i, (population, _, history) in enumerate(results):
+                    histories[i].extend(history)
+                    if population[0][1] < best_fitness:
+                        best_fitness = population[0][1]
+                        best_genome = population[0][0]
+                for index in range(max(len(history) for _, _, history in results)):
+                    self.best_fitness_history.append(
+                        min(history[index] for _, _, history in results if index < len(history))
+                    )
+
+                # Migration: the best individuals replace the worst of the receivers
+                incoming = [[] for _ in range(islands)]
+                for i, (population, _, _) in enumerate(results):
+                    targets = [(i + 1) % islands] if topology == 'ring' else [j for j in range(islands) if j != i]
+                    for j in targets:
+                        if j != i:
+                            incoming[j].extend(population[:migrants])
+                island_states = []
+                for (population, rng_state, _), rate, arrivals in zip(results, mutation_rates, incoming):
+                    kept = population[:len(population) - len(arrivals)] if arrivals else population
+                    merged = sorted(kept + arrivals, key=lambda item: item[1])
+                    island_states.append((merged, rng_state, rate))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        best = self.problem.decode(self._genome_from_bytes(best_genome)) if best_genome is not None else None
+        return best, histories
+
+    def _island_chunk(self, tasks):
+        """
+        Evolve islands for one migration interval. Each task is (population,
+        RNG state, mutation rate, generations), with population None on the
+        first interval; returns (sorted population, RNG state, history) per task.
+        """
+        results = []
+        for population, rng_state, rate, generations in tasks:
+            # An island is a shallow copy sharing the immutable problem data
+            island = copy.copy(self)
+            island.rng = random.Random()
+            island.rng.setstate(rng_state)
+            island.MUTATION_RATE = rate
+            island.fitness_stats = {'hits': 0, 'misses': 0}
+            island.diversity_history = []
+            island.mutation_rate_history = []
+            island.diversity_stats = {'duplicates': 0, 'restarts': 0}
+            if population is None:
+                states = island.generate_initial_population()
+            else:
+                states = [island._new_state(self._genome_from_bytes(data)) for data, _ in population]
+
+            history = []
+            scored = sorted(((state, state.score) for state in states), key=lambda x: x[1])
+            for _ in range(generations):
+                history.append(scored[0][1])
+                if scored[0][1] == 0:
+                    break
+                states = island._next_generation(scored, None, 1)
+                scored = sorted(((state, state.score) for state in states), key=lambda x: x[1])
 
-        # Return best after final generation
-        return best_solution
\ No newline at end of file
+            population = [(state.genome.tobytes(), score) for state, score in scored]
+            results.append((population, island.rng.getstate(), history))
+        return results
\ No newline at end of file
@@ -0,0 +1,518 @@
+"""
+Compact integer encoding of a timetable problem for the genetic algorithm.
+"""
+import copy
+from array import array
+
+import numpy as np
+
+from algorithms.slot_model import SlotModel
+
+
+class TimetableProblem:
+    def __init__(self, entries, time_slots, lectures_per_course, max_lectures_per_day):
+        """
+        entries: list of dicts with keys 'course', 'class_section', 'room', 'teacher'
+        time_slots: SlotModel, or list of time slot strings ("Day HH:MM AM-HH:MM PM")
+        lectures_per_course: Number of lectures per course per week
+        max_lectures_per_day: Maximum lectures of the same course per day
+
+        Teachers, rooms, sections, courses and slots are interned to small
+        integers once here, so an individual is just a flat array of slot
+        indices (one per lecture) and never needs string parsing.
+        """
+        self.LECTURES_PER_COURSE = lectures_per_course
+        self.MAX_LECTURES_PER_DAY = max_lectures_per_day
+
+        # Slots and the day each one belongs to; strings are only needed to
+        # encode and decode dict timetables
+        self.slot_model = time_slots if isinstance(time_slots, SlotModel) else SlotModel.from_labels(time_slots)
+        self.time_slots = self.slot_model.labels()
+        self.slot_index = {ts: i for i, ts in enumerate(self.time_slots)}
+        self.days = self.slot_model.days
+        self.slot_day = self.slot_model.slot_day
+        self.day_slots = self.slot_model.day_slots
+        self.num_slots = self.slot_model.num_slots
+        self.num_days = self.slot_model.num_days
+        # Minimum number of distinct days a course should be spread over
+        self.min_spread_days = min(3, self.num_days)
+
+        # One gene per lecture, keyed the same way as the dict timetables;
+        # later entries for the same (course, section) overwrite earlier ones.
+        lectures = {}
+        for entry in entries:
+            for i in range(lectures_per_course):
+                lectures[(entry['course'], entry['class_section'], i)] = (entry['room'], entry['teacher'])
+        self.lecture_keys = list(lectures.keys())
+        self.num_lectures = len(self.lecture_keys)
+
+        self.rooms = []
+        self.teachers = []
+        self.sections = []
+        self.courses = []  # (course, section) pairs
+        room_index, teacher_index, section_index, course_index = {}, {}, {}, {}
+        self.lecture_room = []
+        self.lecture_teacher = []
+        self.lecture_section = []
+        self.lecture_course = []
+        for (course, section, _), (room, teacher) in lectures.items():
+            self.lecture_room.append(self._intern(room, room_index, self.rooms))
+            self.lecture_teacher.append(self._intern(teacher, teacher_index, self.teachers))
+            self.lecture_section.append(self._intern(section, section_index, self.sections))
+            self.lecture_course.append(self._intern((course, section), course_index, self.courses))
+
+        # Optional penalty for moving lectures away from a reference timetable
+        # (used when re-optimizing a published timetable)
+        self.reference_genome = None
+        self.stability_weights = None
+
+        # Static lookup tables for the vectorized population scorer
+        self._np_slot_day = np.array(self.slot_day, dtype=np.intp)
+        self._np_room = np.array(self.lecture_room, dtype=np.intp)
+        self._np_teacher = np.array(self.lecture_teacher, dtype=np.intp)
+        self._np_section = np.array(self.lecture_section, dtype=np.intp)
+        self._np_course = np.array(self.lecture_course, dtype=np.intp)
+
+    @staticmethod
+    def _intern(value, index, values):
+        """Return the integer id of value, assigning the next free id if it is new."""
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+        return index[value]
+
+    def with_stability(self, reference_genome, weights):
+        """
+        Return a copy of the problem that adds weights[i] to the score while
+        lecture i is not in its slot from reference_genome.
+        """
+        other = copy.copy(self)
+        other.reference_genome = array('H', reference_genome)
+        other.stability_weights = list(weights)
+        other._np_reference = np.array(other.reference_genome, dtype=np.intp)
+        other._np_stability = np.array(other.stability_weights, dtype=np.intp)
+        return other
+
+    def encode(self, timetable):
+        """Convert a dict timetable keyed by (course, section, i) into a genome."""
+        return array('H', (self.slot_index[timetable[key]['time_slot']] for key in self.lecture_keys))
+
+    def decode(self, genome):
+        """Convert a genome back into the dict timetable shape used by the UI."""
+        timetable = {}
+        for key, slot, room, teacher in zip(self.lecture_keys, genome, self.lecture_room, self.lecture_teacher):
+            timetable[key] = {
+                'time_slot': self.time_slots[slot],
+                'room': self.rooms[room],
+                'teacher': self.teachers[teacher]
+            }
+        return timetable
+
+    def fitness(self, genome):
+        """
+        Calculate fitness score of a genome: lower is better (fewer conflicts).
+        Uses the same penalties as TimetableGeneticAlgorithm.calculate_fitness.
+        """
+        num_slots = self.num_slots
+        num_days = self.num_days
+        slot_day = self.slot_day
+        max_per_day = self.MAX_LECTURES_PER_DAY
+
+        room_usage = [0] * (len(self.rooms) * num_slots)
+        teacher_usage = [0] * (len(self.teachers) * num_slots)
+        class_usage = [0] * (len(self.sections) * num_slots)
+        course_day_counts = [0] * (len(self.courses) * num_days)
+        section_day_counts = [0] * (len(self.sections) * num_days)
+        teacher_day_counts = [0] * (len(self.teachers) * num_days)
+
+        score = 0
+        for slot, room, teacher, section, course in zip(genome, self.lecture_room, self.lecture_teacher,
+                                                        self.lecture_section, self.lecture_course):
+            day = slot_day[slot]
+
+            # Room conflict - same room, same time
+            key = room * num_slots + slot
+            if room_usage[key]:
+                score += 20
+            room_usage[key] += 1
+
+            # Teacher conflict - same teacher, same time
+            key = teacher * num_slots + slot
+            if teacher_usage[key]:
+                score += 15
+            teacher_usage[key] += 1
+
+            # Class conflict - same class, same time
+            key = section * num_slots + slot
+            if class_usage[key]:
+                score += 25
+            class_usage[key] += 1
+
+            # Too many lectures of the same course on one day
+            key = course * num_days + day
+            course_day_counts[key] += 1
+            if course_day_counts[key] > max_per_day:
+                score += 15
+
+            # 4+ classes on one day for the same section
+            key = section * num_days + day
+            section_day_counts[key] += 1
+            if section_day_counts[key] > 3:
+                score += 10
+
+            # Teachers with more than 3 classes per day
+            key = teacher * num_days + day
+            teacher_day_counts[key] += 1
+            if teacher_day_counts[key] > 3:
+                score += 5
+
+        # Courses not spread across enough different days. Every course always
+        # has exactly LECTURES_PER_COURSE genes, so the lecture count penalty
+        # of the dict representation can never fire here.
+        min_days = self.min_spread_days
+        for start in range(0, len(course_day_counts), num_days or 1):
+            days_used = num_days - course_day_counts[start:start + num_days].count(0)
+            if days_used < min_days:
+                score += 20 * (min_days - days_used)
+
+        # Lectures moved away from the reference timetable
+        if self.stability_weights is not None:
+            score += sum(weight for weight, slot, reference in zip(self.stability_weights, genome, self.reference_genome)
+                         if slot != reference)
+
+        return score
+
+    def population_matrix(self, genomes):
+        """Stack genomes into a (population x lectures) slot-index matrix."""
+        matrix = np.empty((len(genomes), self.num_lectures), dtype=np.intp)
+        for row, genome in enumerate(genomes):
+            matrix[row] = genome
+        return matrix
+
+    @staticmethod
+    def _group_counts(keys, size):
+        """Count occurrences of each key in 0..size-1, separately for every row."""
+        rows = keys.shape[0]
+        offsets = np.arange(rows, dtype=np.intp)[:, None] * size
+        counts = np.bincount((keys + offsets).ravel(), minlength=rows * size)
+        return counts.reshape(rows, size)
+
+    def fitness_population(self, pop_matrix):
+        """
+        Score a whole (population x lectures) slot-index matrix at once.
+        Returns an int array with the same value fitness() gives for each row.
+        """
+        slots = np.asarray(pop_matrix, dtype=np.intp)
+        if slots.ndim != 2 or slots.shape[1] != self.num_lectures:
+            raise ValueError("Population matrix must have one column per lecture.")
+        num_slots = self.num_slots
+        num_days = self.num_days
+        days = self._np_slot_day[slots]
+
+        def excess(counts, limit):
+            return np.maximum(counts - limit, 0).sum(axis=1)
+
+        # Double-booked rooms, teachers and classes
+        room_counts = self._group_counts(self._np_room * num_slots + slots, len(self.rooms) * num_slots)
+        teacher_counts = self._group_counts(self._np_teacher * num_slots + slots, len(self.teachers) * num_slots)
+        class_counts = self._group_counts(self._np_section * num_slots + slots, len(self.sections) * num_slots)
+        score = 20 * excess(room_counts, 1) + 15 * excess(teacher_counts, 1) + 25 * excess(class_counts, 1)
+
+        # Per-day load of courses, sections and teachers
+        course_day_counts = self._group_counts(self._np_course * num_days + days, len(self.courses) * num_days)
+        section_day_counts = self._group_counts(self._np_section * num_days + days, len(self.sections) * num_days)
+        teacher_day_counts = self._group_counts(self._np_teacher * num_days + days, len(self.teachers) * num_days)
+        score += 15 * excess(course_day_counts, self.MAX_LECTURES_PER_DAY)
+        score += 10 * excess(section_day_counts, 3)
+        score += 5 * excess(teacher_day_counts, 3)
+
+        # Courses not spread across enough different days
+        days_used = (course_day_counts.reshape(len(slots), len(self.courses), num_days) > 0).sum(axis=2)
+        score += 20 * np.maximum(self.min_spread_days - days_used, 0).sum(axis=1)
+
+        # Lectures moved away from the reference timetable
+        if self.stability_weights is not None:
+            score += ((slots != self._np_reference) * self._np_stability).sum(axis=1)
+
+        return score
+
+    def population_diversity(self, pop_matrix):
+        """
+        Mean normalized Hamming distance over all pairs of rows of a
+        (population x lectures) slot-index matrix: 0 when every genome is
+        identical, close to 1 for a random population.
+        """
+        slots = np.asarray(pop_matrix, dtype=np.intp)
+        rows = slots.shape[0]
+        if rows < 2 or self.num_lectures == 0:
+            return 0.0
+        # Pairs of genomes that agree on a lecture, from per-lecture slot counts
+        counts = self._group_counts(slots.T, self.num_slots)
+        agreeing = (counts * (counts - 1) // 2).sum()
+        pairs = self.num_lectures * rows * (rows - 1) // 2
+        return float(1.0 - agreeing / pairs)
+
+
+class TimetableState:
+    def __init__(self, problem, genome, debug=False):
+        """
+        problem: TimetableProblem the genome belongs to
+        genome: slot-index array, owned by this state from now on
+        debug: cross-check every incremental update against a full recomputation
+
+        Carries the conflict counters behind the fitness score (room x slot,
+        teacher x slot, section x slot, course-day, section-day and teacher-day
+        occupancy), so moving a lecture updates the score in O(1) instead of
+        rescoring the whole genome.
+        """
+        self.problem = problem
+        self.genome = genome
+        self.debug = debug
+        if genome is None:
+            return  # Counters filled in by copy()
+
+        num_slots = problem.num_slots
+        num_days = problem.num_days
+        self.room_usage = [0] * (len(problem.rooms) * num_slots)
+        self.teacher_usage = [0] * (len(problem.teachers) * num_slots)
+        self.class_usage = [0] * (len(problem.sections) * num_slots)
+        self.course_day_counts = [0] * (len(problem.courses) * num_days)
+        self.section_day_counts = [0] * (len(problem.sections) * num_days)
+        self.teacher_day_counts = [0] * (len(problem.teachers) * num_days)
+        self.course_days_used = [0] * len(problem.courses)
+
+        # Every course starts out spread over zero days; placing lectures
+        # pays that penalty back as new days are used.
+        self.score = 20 * problem.min_spread_days * len(problem.courses)
+        for lecture, slot in enumerate(genome):
+            self.score += self._add(lecture, slot)
+        if debug:
+            self.check()
+
+    def copy(self):
+        """Return an independent copy of this state."""
+        other = TimetableState(self.problem, None, self.debug)
+        other.genome = self.genome[:]
+        other.room_usage = self.room_usage[:]
+        other.teacher_usage = self.teacher_usage[:]
+        other.class_usage = self.class_usage[:]
+        other.course_day_counts = self.course_day_counts[:]
+        other.section_day_counts = self.section_day_counts[:]
+        other.teacher_day_counts = self.teacher_day_counts[:]
+        other.course_days_used = self.course_days_used[:]
+        other.score = self.score
+        return other
+
+    def _add(self, lecture, slot):
+        """Place a lecture in slot and return the resulting score change."""
+        problem = self.problem
+        room = problem.lecture_room[lecture]
+        teacher = problem.lecture_teacher[lecture]
+        section = problem.lecture_section[lecture]
+        course = problem.lecture_course[lecture]
+        day = problem.slot_day[slot]
+        num_slots = problem.num_slots
+        num_days = problem.num_days
+        delta = 0
+
+        key = room * num_slots + slot
+        if self.room_usage[key]:
+            delta += 20
+        self.room_usage[key] += 1
+
+        key = teacher * num_slots + slot
+        if self.teacher_usage[key]:
+            delta += 15
+        self.teacher_usage[key] += 1
+
+        key = section * num_slots + slot
+        if self.class_usage[key]:
+            delta += 25
+        self.class_usage[key] += 1
+
+        key = course * num_days + day
+        count = self.course_day_counts[key]
+        if count >= problem.MAX_LECTURES_PER_DAY:
+            delta += 15
+        if count == 0:
+            if self.course_days_used[course] < problem.min_spread_days:
+                delta -= 20
+            self.course_days_used[course] += 1
+        self.course_day_counts[key] = count + 1
+
+        key = section * num_days + day
+        if self.section_day_counts[key] >= 3:
+            delta += 10
+        self.section_day_counts[key] += 1
+
+        key = teacher * num_days + day
+        if self.teacher_day_counts[key] >= 3:
+            delta += 5
+        self.teacher_day_counts[key] += 1
+
+        if problem.stability_weights is not None and slot != problem.reference_genome[lecture]:
+            delta += problem.stability_weights[lecture]
+
+        return delta
+
+    def _remove(self, lecture, slot):
+        """Take a lecture out of slot and return the resulting score change."""
+        problem = self.problem
+        room = problem.lecture_room[lecture]
+        teacher = problem.lecture_teacher[lecture]
+        section = problem.lecture_section[lecture]
+        course = problem.lecture_course[lecture]
+        day = problem.slot_day[slot]
+        num_slots = problem.num_slots
+        num_days = problem.num_days
+        delta = 0
+
+        key = room * num_slots + slot
+        self.room_usage[key] -= 1
+        if self.room_usage[key]:
+            delta -= 20
+
+        key = teacher * num_slots + slot
+        self.teacher_usage[key] -= 1
+        if self.teacher_usage[key]:
+            delta -= 15
+
+        key = section * num_slots + slot
+        self.class_usage[key] -= 1
+        if self.class_usage[key]:
+            delta -= 25
+
+        key = course * num_days + day
+        count = self.course_day_counts[key] - 1
+        self.course_day_counts[key] = count
+        if count >= problem.MAX_LECTURES_PER_DAY:
+            delta -= 15
+        if count == 0:
+            self.course_days_used[course] -= 1
+            if self.course_days_used[course] < problem.min_spread_days:
+                delta += 20
+
+        key = section * num_days + day
+        self.section_day_counts[key] -= 1
+        if self.section_day_counts[key] >= 3:
+            delta -= 10
+
+        key = teacher * num_days + day
+        self.teacher_day_counts[key] -= 1
+        if self.teacher_day_counts[key] >= 3:
+            delta -= 5
+
+        if problem.stability_weights is not None and slot != problem.reference_genome[lecture]:
+            delta -= problem.stability_weights[lecture]
+
+        return delta
+
+    def _apply(self, lecture, new_slot):
+        """Move a lecture without any debug checks and return the score change."""
+        old_slot = self.genome[lecture]
+        if old_slot == new_slot:
+            return 0
+        delta = self._remove(lecture, old_slot) + self._add(lecture, new_slot)
+        self.genome[lecture] = new_slot
+        self.score += delta
+        return delta
+
+    def move(self, lecture, new_slot):
+        """Move a lecture to new_slot, update the score and return the change."""
+        delta = self._apply(lecture, new_slot)
+        if self.debug:
+            self.check()
+        return delta
+
+    def move_delta(self, lecture, new_slot):
+        """Return the score change moving a lecture would cause, without moving it."""
+        old_slot = self.genome[lecture]
+        delta = self._apply(lecture, new_slot)
+        self._apply(lecture, old_slot)
+        return delta
+
+    def unplace(self, lecture):
+        """
+        Take a lecture out of the counters (its genome entry is left as is)
+        until place() puts it back; the score then omits it.
+        """
+        self.score += self._remove(lecture, self.genome[lecture])
+
+    def place(self, lecture, slot):
+        """Put an unplaced lecture into slot and return the score change."""
+        delta = self._add(lecture, slot)
+        self.genome[lecture] = slot
+        self.score += delta
+        return delta
+
+    def place_delta(self, lecture, slot):
+        """Return the score change placing an unplaced lecture would cause, without placing it."""
+        delta = self._add(lecture, slot)
+        self._remove(lecture, slot)
+        return delta
+
+    def swap(self, lecture1, lecture2):
+        """Exchange the slots of two lectures and return the score change."""
+        slot1, slot2 = self.genome[lecture1], self.genome[lecture2]
+        delta = self._apply(lecture1, slot2) + self._apply(lecture2, slot1)
+        if self.debug:
+            self.check()
+        return delta
+
+    def swap_delta(self, lecture1, lecture2):
+        """Return the score change swapping two lectures' slots would cause, without swapping."""
+        slot1, slot2 = self.genome[lecture1], self.genome[lecture2]
+        delta = self._apply(lecture1, slot2) + self._apply(lecture2, slot1)
+        self._apply(lecture2, slot2)
+        self._apply(lecture1, slot1)
+        return delta
+
+    def lecture_conflicted(self, lecture):
+        """True if the lecture takes part in a room/teacher/section clash or a day overload."""
+        problem = self.problem
+        slot = self.genome[lecture]
+        day = problem.slot_day[slot]
+        room = problem.lecture_room[lecture]
+        teacher = problem.lecture_teacher[lecture]
+        section = problem.lecture_section[lecture]
+        num_slots = problem.num_slots
+        num_days = problem.num_days
+        return (self.room_usage[room * num_slots + slot] > 1
+                or self.teacher_usage[teacher * num_slots + slot] > 1
+                or self.class_usage[section * num_slots + slot] > 1
+                or self.course_day_counts[problem.lecture_course[lecture] * num_days + day] > problem.MAX_LECTURES_PER_DAY
+                or self.section_day_counts[section * num_days + day] > 3
+                or self.teacher_day_counts[teacher * num_days + day] > 3)
+
+    def conflicted_lectures(self):
+        """Return the indices of all lectures involved in a clash or day overload."""
+        return [lecture for lecture in range(len(self.genome)) if self.lecture_conflicted(lecture)]
+
+    def free_slots(self, lecture):
+        """Return the slots where the lecture's room, teacher and section are all unoccupied."""
+        problem = self.problem
+        num_slots = problem.num_slots
+        room_base = problem.lecture_room[lecture] * num_slots
+        teacher_base = problem.lecture_teacher[lecture] * num_slots
+        section_base = problem.lecture_section[lecture] * num_slots
+        return [slot for slot in range(num_slots)
+                if not self.room_usage[room_base + slot]
+                and not self.teacher_usage[teacher_base + slot]
+                and not self.class_usage[section_base + slot]]
+
+    def check(self):
+        """Raise AssertionError if the carried score differs from a full recomputation."""
+        expected = self.problem.fitness(self.genome)
+        if self.score != expected:
+            raise AssertionError(
+                f"Incremental fitness {self.score} does not match full recomputation {expected}"
+            )
+
+
+class ScoredGenome:
+    """A genome and its score, without the counters of a TimetableState."""
+    __slots__ = ('genome', 'score')
+
+    def __init__(self, genome, score):
+        self.genome = genome
+        self.score = score
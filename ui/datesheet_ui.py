@@ -3,8 +3,9 @@ from tkinter import messagebox, ttk
 from tkcalendar import Calendar
 from datetime import datetime
 
-from algorithms.datesheet_ga import DatesheetGeneticAlgorithm
+from algorithms.exam_conflicts import schedule_exams
 from db.datesheet_db import init_datesheet_db, save_datesheet, load_datesheet
+from db.timetable_db import load_timetable
 
 # Global variables
 datesheet_entries = []
@@ -24,6 +25,8 @@ dt_end_time_entry = None
 
 dt_room_entry = None
 
+dt_holidays_entry = None
+
 subject_entries = []
 
 dt_generate_button = None
@@ -34,6 +37,7 @@ root = None
 def initialize(master, title_font, header_font, normal_font, button_font, return_home_func):
     global DT_header_frame, DT_frame, dt_treeview
     global dt_start_date_entry, dt_end_date_entry, dt_start_time_entry, dt_end_time_entry, dt_room_entry
+    global dt_holidays_entry
     global subject_entries, dt_generate_button, root
 
     root = master
@@ -120,6 +124,13 @@ def initialize(master, title_font, header_font, normal_font, button_font, return
     tk.Button(dt_left, text="Save Entry", font=button_font, bg="#198754", fg="white",
               command=save_dt_entry, padx=10, pady=5, borderwidth=0).grid(row=8, column=0, columnspan=2, pady=15)
 
+    # Holidays (apply to all entries, no exams on these dates)
+    tk.Label(dt_left, text="Holidays:", bg="white", fg="#495057", font=normal_font).grid(row=9, column=0, sticky="w", pady=5)
+    dt_holidays_entry = ttk.Entry(dt_left, font=normal_font)
+    dt_holidays_entry.grid(row=9, column=1, sticky="ew", pady=5)
+    tk.Label(dt_left, text="YYYY-MM-DD, comma separated", bg="white", fg="#6c757d",
+             font=normal_font).grid(row=10, column=1, sticky="w")
+
     # Right side: Treeview
     tk.Label(dt_right, text="Saved Datesheet Entries", bg="#f8f9fa", fg="#212529", font=header_font).pack(anchor="w", pady=5)
     tree_container = tk.Frame(dt_right, bg="#f8f9fa")
@@ -256,29 +267,39 @@ def edit_dt_entry(event):
 
 
 def generate_datesheet():
-    """Run GA and show optimized schedule"""
+    """Colour the student-conflict graph, refine with the GA and show the schedule"""
     if not datesheet_entries:
         messagebox.showinfo("Info", "Add entries first.")
         return
+    holidays = [d.strip() for d in dt_holidays_entry.get().split(',') if d.strip()]
+    try:
+        for d in holidays:
+            datetime.strptime(d, '%Y-%m-%d')
+    except ValueError:
+        messagebox.showerror("Error", "Invalid holiday date format.")
+        return
     try:
-        ga = DatesheetGeneticAlgorithm(datesheet_entries)
-        sched = ga.run()
+        # One exam per subject, placed on exam days x sessions of its date range;
+        # courses sharing class sections in the timetable never share a slot
+        domain, sched, stats = schedule_exams(datesheet_entries, load_timetable(), holidays,
+                                              refine_generations=100)
+        if stats['student_clashes'] or stats['hard_clashes']:
+            messagebox.showwarning("Warning", f"{stats['student_clashes']} student clashes and "
+                                              f"{stats['hard_clashes']} room/subject clashes could not be avoided; "
+                                              "widen the date ranges or add sessions.")
+        sched.sort(key=lambda e: domain.slot_index[e['date']])
         # Display in new window
         win = tk.Toplevel(root)
         win.title("Optimized Datesheet")
-        cols = ('Start','End','S.Time','E.Time','Subjects','Room')
+        cols = ('Date','Session','Subject','Room')
         tree = ttk.Treeview(win, columns=cols, show='headings')
         for c in cols:
             tree.heading(c, text=c)
             tree.column(c, anchor='center')
         tree.pack(fill='both', expand=True, padx=10, pady=10)
         for e in sched:
-            tree.insert('', 'end', values=(
-                e['start_date'], e['end_date'],
-                e['start_time'], e['end_time'],
-                ", ".join(e.get('subjects', [])),
-                e['room']
-            ))
+            date, session = domain.describe(e['date'])
+            tree.insert('', 'end', values=(date, session, e['subject'], e['room']))
     except Exception as ex:
         messagebox.showerror("Error", f"Failed to generate: {ex}")
 
@@ -3,8 +3,10 @@ from tkinter import messagebox, ttk
 import datetime
 import random
 import sqlite3
-from datetime import datetime, timedelta
-from algorithms.timetable_ga import TimetableGeneticAlgorithm
+from datetime import datetime
+from algorithms.decomposition import generate_decomposed_timetable
+from algorithms.portfolio import solve_portfolio
+from algorithms.slot_model import SlotModel
 from db.timetable_db import init_timetable_db, save_timetable, load_timetable
 
 # Global variables
@@ -396,7 +398,7 @@ def generate_timetable():
 
     dialog = tk.Toplevel(root)
     dialog.title("Timetable Configuration")
-    dialog.geometry("500x450")
+    dialog.geometry("500x490")
     dialog.resizable(False, False)
     dialog.grab_set()
     
@@ -460,6 +462,11 @@ def generate_timetable():
     end_time_entry = ttk.Entry(form_frame, textvariable=end_time_var, width=20)
     end_time_entry.grid(row=6, column=1, sticky="w", pady=5)
     
+    tk.Label(form_frame, text="Solver:", anchor="w").grid(row=7, column=0, sticky="w", pady=5)
+    solver_var = tk.StringVar(value="Genetic Algorithm")
+    solver_cb = ttk.Combobox(form_frame, values=["Genetic Algorithm", "Portfolio (all cores)"], textvariable=solver_var, width=18, state="readonly")
+    solver_cb.grid(row=7, column=1, sticky="w", pady=5)
+    
     btn_frame = tk.Frame(main_frame)
     btn_frame.pack(fill="x", expand=True, pady=(20, 0))
     
@@ -486,7 +493,8 @@ def generate_timetable():
                 max_lectures_per_day=max_lectures_per_day,
                 lecture_duration=lecture_duration,
                 start_time=start_time_var.get(),
-                end_time=end_time_var.get()
+                end_time=end_time_var.get(),
+                portfolio=solver_var.get().startswith("Portfolio")
             )
 
         except ValueError as e:
@@ -497,7 +505,7 @@ def generate_timetable():
     tk.Button(btn_frame, text="Generate Timetable", command=validate_and_generate,
               font=("Helvetica", 10, "bold"), bg="#0d6efd", fg="white", padx=20, pady=5, borderwidth=0).pack(side="right", padx=5)
 
-def run_timetable_generation(semester, shift, lectures_per_course, max_lectures_per_day, lecture_duration, start_time, end_time):
+def run_timetable_generation(semester, shift, lectures_per_course, max_lectures_per_day, lecture_duration, start_time, end_time, portfolio=False, time_limit_seconds=60):
     try:
         # Fetch timetable entries from the database
         timetable_entries = load_timetable(semester, shift)
@@ -505,74 +513,52 @@ def run_timetable_generation(semester, shift, lectures_per_course, max_lectures_
             messagebox.showwarning("No Data", "No timetable entries found in the database for the selected semester and shift.")
             return
 
-        # Parse start and end times
-        start_dt = datetime.strptime(start_time, "%I:%M %p")
-        end_dt = datetime.strptime(end_time, "%I:%M %p")
-
         # Generate time slots based on dialog box constraints
         selected_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-        time_slots = generate_time_slots(start_dt, end_dt, lecture_duration, 10, selected_days)
+        slot_model = SlotModel.from_config(start_time, end_time, lecture_duration, 10, selected_days)
 
-        if not time_slots:
+        if not slot_model.num_slots:
             messagebox.showwarning("Configuration Error", "Could not generate any valid time slots with the given parameters.")
             return
 
         # Prepare entries for the genetic algorithm
-        ga_entries = prepare_entries_for_ga(timetable_entries, time_slots)
-
-        # Run the genetic algorithm
-        ga = TimetableGeneticAlgorithm(
-            semester=semester,
-            shift=shift,
-            lectures_per_course=lectures_per_course,
-            max_lectures_per_day=max_lectures_per_day,
-            lecture_duration=lecture_duration,
-            start_time=start_time,
-            end_time=end_time,
-            population_size=100,
-            max_generations=100,
-            mutation_rate=0.15
-        )
-        optimized = ga.generate_optimized_timetable()
+        ga_entries = prepare_entries_for_ga(timetable_entries, slot_model.labels())
+
+        if portfolio:
+            # Race GA seeds and the other engines on all cores
+            config = {
+                'lectures_per_course': lectures_per_course,
+                'max_lectures_per_day': max_lectures_per_day,
+                'lecture_duration': lecture_duration,
+                'start_time': start_time,
+                'end_time': end_time,
+            }
+            optimized, _ = solve_portfolio(timetable_entries, config, time_budget_seconds=time_limit_seconds)
+        else:
+            # Run the genetic algorithm, separately (and in parallel) for every
+            # group of sections that shares no teachers or rooms with the others
+            optimized = generate_decomposed_timetable(
+                timetable_entries,
+                lectures_per_course=lectures_per_course,
+                max_lectures_per_day=max_lectures_per_day,
+                lecture_duration=lecture_duration,
+                start_time=start_time,
+                end_time=end_time,
+                population_size=100,
+                max_generations=100,
+                mutation_rate=0.15
+            )
 
         if optimized is None:
             messagebox.showwarning("Generation Failed", "Could not generate a valid timetable.")
             return
 
         # Display the generated timetable
-        display_timetable(optimized, time_slots, selected_days, lecture_duration, semester, shift)
+        display_timetable(optimized, slot_model, semester, shift)
 
     except Exception as ex:
         messagebox.showerror("Error", f"Failed to generate timetable: {str(ex)}")
         
-def generate_time_slots(start_dt, end_dt, lecture_duration, break_duration, selected_days):
-    time_slots = []
-    
-    total_minutes = ((end_dt.hour * 60 + end_dt.minute) - 
-                    (start_dt.hour * 60 + start_dt.minute))
-    slot_duration = lecture_duration + break_duration
-    slots_per_day = total_minutes // slot_duration
-    
-    if slots_per_day <= 0:
-        return []
-    
-    for day in selected_days:
-        current_time = start_dt
-        for _ in range(slots_per_day):
-            end_time = (datetime(1, 1, 1, current_time.hour, current_time.minute) + 
-                      timedelta(minutes=lecture_duration))
-            
-            slot_start = current_time.strftime("%I:%M %p")
-            slot_end = end_time.strftime("%I:%M %p")
-            
-            time_slot = f"{day} {slot_start}-{slot_end}"
-            time_slots.append(time_slot)
-            
-            current_time = (datetime(1, 1, 1, current_time.hour, current_time.minute) + 
-                          timedelta(minutes=slot_duration))
-    
-    return time_slots
-
 def prepare_entries_for_ga(entries, time_slots):
     ga_entries = []
     
@@ -583,7 +569,7 @@ def prepare_entries_for_ga(entries, time_slots):
     
     return ga_entries
 
-def display_timetable(optimized, time_slots, selected_days, lecture_duration, semester, shift):
+def display_timetable(optimized, slot_model, semester, shift):
     win = tk.Toplevel(root)
     win.title(f"Optimized Timetable - Semester {semester} ({shift} Shift)")
     win.geometry("1000x600")
@@ -597,10 +583,8 @@ def display_timetable(optimized, time_slots, selected_days, lecture_duration, se
     tk.Label(header_frame, text=f"Semester {semester} - {shift} Shift", 
             font=("Helvetica", 14, "bold"), bg="#f0f0f0").pack(pady=10)
     
-    courses = sorted(list(optimized.keys()), key=lambda x: (x[1], x[0]))
-    
-    days = list(set(slot.split()[0] for slot in time_slots))
-    times = sorted(list(set(" ".join(slot.split()[1:]) for slot in time_slots)))
+    days = slot_model.days
+    times = slot_model.period_ranges()
     
     tree_frame = tk.Frame(main_frame)
     tree_frame.pack(fill="both", expand=True)
@@ -612,23 +596,15 @@ def display_timetable(optimized, time_slots, selected_days, lecture_duration, se
         tree.heading(col, text=col)
         tree.column(col, width=len(col) * 15, anchor="center")
     
-    for time_range in times:
-        tree.insert("", "end", values=[time_range] + ["" for _ in days])
+    # One row per daily period, one column per day; lectures sharing a cell are stacked
+    cells = [[[] for _ in days] for _ in times]
+    for (course, class_sec, _), details in optimized.items():
+        slot = slot_model.index(details['time_slot'])
+        cells[slot_model.slot_period[slot]][slot_model.slot_day[slot]].append(
+            f"{course}\n{class_sec}\n{details['teacher']}\nRoom: {details['room']}")
     
-    for (course, class_sec), details in optimized.items():
-        slot = details['time_slot']
-        day, time_part = slot.split(" ", 1)
-        
-        for item_id in tree.get_children():
-            if tree.item(item_id)["values"][0] == time_part:
-                row_id = item_id
-                break
-        
-        day_idx = columns.index(day)
-        row_values = list(tree.item(row_id)["values"])
-        row_values[day_idx] = f"{course}\n{class_sec}\n{details['teacher']}\nRoom: {details['room']}"
-        
-        tree.item(row_id, values=row_values)
+    for time_range, row in zip(times, cells):
+        tree.insert("", "end", values=[time_range] + ["\n".join(cell) for cell in row])
     
     vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
     tree.configure(yscrollcommand=vsb.set)